@@ -0,0 +1,99 @@
+"""Measure the cold-start time of each social card renderer.
+
+Each measurement runs in a fresh interpreter with an empty Matplotlib
+configuration directory, like an ephemeral CI container, and times importing
+the renderer, creating it and rendering a single card.
+A second, warm run reuses the configuration directory of the first.
+The difference between the two is mostly Matplotlib building its list of
+the fonts installed on the system, which is reported for each renderer along
+with whether the run left a font list in the configuration directory.
+
+  python benchmarks/cold_start.py [--repeat N] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RENDERERS = ('matplotlib', 'pillow')
+
+# Run in the child interpreter, prints the timings as JSON
+SCRIPT = """
+import json, sys, tempfile, time
+from pathlib import Path
+
+t0 = time.perf_counter()
+from sphinxext.opengraph._social_cards import get_renderer
+renderer_cls = get_renderer(sys.argv[1])
+t1 = time.perf_counter()
+renderer = renderer_cls()
+t2 = time.perf_counter()
+with tempfile.TemporaryDirectory() as tmp:
+    image = renderer.render('Site', 'Page title', 'Description', 'x.org')
+    image.save(Path(tmp, 'card.png'))
+t3 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create': t2 - t1, 'first_render': t3 - t2}))
+"""
+
+
+def run_once(renderer: str, config_dir: str) -> dict[str, float]:
+    """Time one run of *renderer* in a fresh interpreter."""
+    env = os.environ | {'MPLCONFIGDIR': config_dir}
+    result = subprocess.run(  # NoQA: S603
+        (sys.executable, '-c', SCRIPT, renderer),
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['total'] = sum(timings.values())
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    results = {}
+    for renderer in RENDERERS:
+        cold, warm = [], []
+        font_list = False
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as config_dir:
+                cold.append(run_once(renderer, config_dir))
+                # Matplotlib writes the fonts it found on the system here
+                font_list |= any(Path(config_dir).glob('fontlist-*.json'))
+                warm.append(run_once(renderer, config_dir))
+        results[renderer] = {
+            'cold': {k: statistics.median(r[k] for r in cold) for k in cold[0]},
+            'warm': {k: statistics.median(r[k] for r in warm) for k in warm[0]},
+        }
+        for kind, timings in results[renderer].items():
+            print(
+                f'{renderer:>10} {kind}: '
+                + ', '.join(f'{k} {v * 1000:.0f} ms' for k, v in timings.items())
+            )
+        gap = results[renderer]['cold']['total'] - results[renderer]['warm']['total']
+        results[renderer]['cold_minus_warm'] = gap
+        results[renderer]['font_list_written'] = font_list
+        print(
+            f'{renderer:>10} cold - warm: {gap * 1000:.0f} ms, '
+            f'font list {"written" if font_list else "not written"}'
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
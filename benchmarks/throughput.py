@@ -0,0 +1,194 @@
+"""Measure the throughput and memory use of each social card renderer.
+
+Each renderer runs in a fresh interpreter, which renders and encodes a set of
+cards with page titles and descriptions drawn from a seeded distribution
+resembling real documentation pages: short prose titles, long dotted API
+names, and descriptions from empty up to the maximum length.
+Reported are the cards rendered per second, the median and 99th percentile
+time per card, the peak memory of the process and the size of the images.
+
+  python benchmarks/throughput.py [--cards N] [--format png] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RENDERERS = ('matplotlib', 'pillow')
+
+WORDS = """
+the a of to and in for with on from by is are be this that it as or can not
+install configure build extension theme page directive role option document
+reference tutorial guide changelog release module function class method
+attribute parameter returns raises example usage overview index api search
+deprecated experimental migration internationalization compatibility
+""".split()  # NoQA: SIM905
+# Titles of generated API pages, which are long and can't be wrapped at spaces
+API_NAMES = (
+    'sphinxext.opengraph._social_cards.create_social_card',
+    'package.subpackage.module.ClassWithAVeryLongName.method_name',
+    'numpy.lib.stride_tricks.sliding_window_view',
+)
+# Text outside of the Latin alphabet, as in translated documentation
+OTHER_SCRIPTS = ('Übersicht', 'Configuración', 'Введение', 'Συμβολή', 'façade')
+
+
+def page_texts(count: int, seed: int) -> list[tuple[str, str]]:
+    """Make *count* page titles and descriptions, the same for the same *seed*."""
+    from sphinxext.opengraph._social_cards import (
+        MAX_CHAR_DESCRIPTION,
+        MAX_CHAR_PAGE_TITLE,
+    )
+
+    rng = random.Random(seed)  # NoQA: S311
+    words = WORDS + list(OTHER_SCRIPTS)
+    texts = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            title = rng.choice(API_NAMES)
+        else:
+            title = ' '.join(rng.choices(words, k=rng.randint(1, 12))).capitalize()
+        title = title[:MAX_CHAR_PAGE_TITLE]
+        # Most pages have a description of a sentence or two, some have none
+        length = min(int(rng.expovariate(1 / 25)), 60)
+        description = ' '.join(rng.choices(words, k=length))
+        texts.append((title, description[:MAX_CHAR_DESCRIPTION]))
+    return texts
+
+
+def peak_rss() -> int:
+    """Get the peak resident memory of this process in bytes."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_renderer(renderer_name: str, count: int, card_format: str, seed: int) -> dict:
+    """Render the cards with one renderer, in this process."""
+    from sphinxext.opengraph._social_cards import (
+        CARD_FORMATS,
+        get_social_card_renderer,
+        save_social_card,
+    )
+
+    texts = page_texts(count, seed)
+    rss_start = peak_rss()
+    start = time.perf_counter()
+    renderer = get_social_card_renderer(renderer_name, {})
+    setup = time.perf_counter() - start
+
+    latencies = []
+    sizes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (title, description) in enumerate(texts):
+            path = Path(tmp, f'card_{i}.{CARD_FORMATS[card_format]}')
+            start = time.perf_counter()
+            image = renderer.render('Site title', title, description, 'example.org')
+            save_social_card(image, path, (card_format, None))
+            latencies.append(time.perf_counter() - start)
+            sizes.append(path.stat().st_size)
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        'cards': count,
+        'setup_ms': setup * 1000,
+        'cards_per_second': count / sum(latencies),
+        'p50_ms': statistics.median(latencies_ms),
+        'p99_ms': latencies_ms[min(count - 1, round(0.99 * (count - 1)))],
+        'peak_rss_mb': peak_rss() / 2**20,
+        'renderer_rss_mb': (peak_rss() - rss_start) / 2**20,
+        'mean_bytes': statistics.mean(sizes),
+        'total_bytes': sum(sizes),
+    }
+
+
+def environment() -> dict[str, str]:
+    """Describe the machine and package versions, to compare results fairly."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    from sphinxext.opengraph import __version__
+
+    info = {
+        'sphinxext-opengraph': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.machine(),
+    }
+    for package in ('matplotlib', 'Pillow', 'numpy'):
+        try:
+            info[package] = version(package)
+        except PackageNotFoundError:  # NoQA: PERF203
+            info[package] = None
+    return info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--format', default='png')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--renderer', action='append', choices=RENDERERS)
+    parser.add_argument('--output', type=Path)
+    # Runs a single renderer in this process, used by the parent process
+    parser.add_argument('--worker', choices=RENDERERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_renderer(args.worker, args.cards, args.format, args.seed)
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for renderer in args.renderer or RENDERERS:
+        # A fresh process per renderer, so that peak memory is its own
+        output = subprocess.run(  # NoQA: S603
+            (
+                sys.executable,
+                __file__,
+                '--worker',
+                renderer,
+                '--cards',
+                str(args.cards),
+                '--format',
+                args.format,
+                '--seed',
+                str(args.seed),
+            ),
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        result = results[renderer] = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f'{renderer:>10}: {result["cards_per_second"]:.1f} cards/s, '
+            f'p50 {result["p50_ms"]:.1f} ms, p99 {result["p99_ms"]:.1f} ms, '
+            f'peak RSS {result["peak_rss_mb"]:.0f} MB, '
+            f'{result["mean_bytes"] / 1000:.1f} kB per card'
+        )
+
+    if args.output:
+        report = {
+            'parameters': {
+                'cards': args.cards,
+                'format': args.format,
+                'seed': args.seed,
+            },
+            'environment': environment(),
+            'results': results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
@@ -14,9 +14,8 @@ from pathlib import Path
 from sphinxext.opengraph._social_cards import (
     MAX_CHAR_DESCRIPTION,
     MAX_CHAR_PAGE_TITLE,
-    create_social_card_objects,
-    render_social_card,
 )
+from sphinxext.opengraph._social_cards_matplotlib import MatplotlibRenderer
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
@@ -34,7 +33,7 @@ kwargs_fig = {
 }
 
 print('Generating previews of social media cards...')
-plt_objects = create_social_card_objects(**kwargs_fig)
+renderer = MatplotlibRenderer(**kwargs_fig)
 grid_items = []
 for perm in range(20):
     # Create dummy text description and pagetitle for this iteration
@@ -50,14 +49,13 @@ for perm in range(20):
     path_tmp.mkdir(exist_ok=True)
     path_out = Path(path_tmp / f'num_{perm}.png')
 
-    plt_objects = render_social_card(
-        path=path_out,
+    image = renderer.render(
         site_title='Sphinx Social Card Demo',
         page_title=title,
         description=desc,
         siteurl='sphinxext-opengraph.readthedocs.io',
-        plt_objects=plt_objects,
     )
+    image.save(path_out)
 
     path_examples_page_folder = PROJECT_ROOT / 'docs' / 'tmp'
     grid_items.append(f"""\
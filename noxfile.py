@@ -13,6 +13,8 @@ ref: https://nox.thea.codes/
 
 from __future__ import annotations
 
+from pathlib import Path
+
 import nox
 
 nox.options.reuse_existing_virtualenvs = True
@@ -38,3 +40,26 @@ def test(session: nox.Session) -> None:
     session.install('-e', '.')
     session.install('--group', 'test')
     session.run('pytest', *session.posargs)
+
+
+@nox.session
+def benchmark(session: nox.Session) -> None:
+    """Run the social card benchmarks, saving their results as JSON.
+
+    Results go to `benchmarks/results`, or the directory given after `--`.
+    """
+    session.install('-e', '.[social_cards,pillow]')
+    output = Path(session.posargs[0] if session.posargs else 'benchmarks/results')
+    output.mkdir(parents=True, exist_ok=True)
+    session.run(
+        'python',
+        'benchmarks/cold_start.py',
+        '--output',
+        str(output / 'cold_start.json'),
+    )
+    session.run(
+        'python',
+        'benchmarks/throughput.py',
+        '--output',
+        str(output / 'throughput.json'),
+    )
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import posixpath
+import sys
 from pathlib import Path
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
@@ -21,22 +22,16 @@ if TYPE_CHECKING:
     from sphinx.environment import BuildEnvironment
     from sphinx.util.typing import ExtensionMetadata
 
-try:
-    from sphinxext.opengraph._social_cards import (
-        DEFAULT_SOCIAL_CONFIG,
-        create_social_card,
-    )
-except ImportError:
-    print('matplotlib is not installed, social cards will not be generated')
-    create_social_card = None
-    DEFAULT_SOCIAL_CONFIG = {}
+    from sphinxext.opengraph._social_cards import CardVariant
 
 __version__ = '0.10.0'
 version_info = (0, 10, 0)
 
 DEFAULT_DESCRIPTION_LENGTH = 200
-DEFAULT_DESCRIPTION_LENGTH_SOCIAL_CARDS = 160
-DEFAULT_PAGE_LENGTH_SOCIAL_CARDS = 80
+# Card text is wrapped to fit the card, with an ellipsis where it runs over.
+# These only bound the text that is measured, well past what fits on a card.
+DEFAULT_DESCRIPTION_LENGTH_SOCIAL_CARDS = 600
+DEFAULT_PAGE_LENGTH_SOCIAL_CARDS = 300
 
 # A selection from https://www.iana.org/assignments/media-types/media-types.xhtml#image
 IMAGE_MIME_TYPES = {
@@ -72,6 +67,103 @@ def html_page_context(
         )
 
 
+def builder_inited(app: Sphinx) -> None:
+    config_social = app.config.ogp_social_cards or {}
+    if (
+        config_social.get('enable') is False
+        or app.config.ogp_image
+        or app.config.ogp_use_first_image
+        or app.builder.format != 'html'
+    ):
+        return
+
+    from sphinxext.opengraph._social_cards import (
+        load_card_index,
+        open_card_cache,
+        start_render_pool,
+        start_render_time,
+    )
+
+    # Look up existing cards in memory rather than on disk for every page
+    load_card_index(app.outdir, doctreedir=app.doctreedir)
+    open_card_cache(config_social, srcdir=app.srcdir)
+    start_render_time()
+
+    # Default to one render process per Sphinx job (``-j``), unless Sphinx
+    # writes pages in parallel, as its writer processes then render the cards
+    workers = config_social.get('workers')
+    if workers is None:
+        workers = 1 if writes_in_parallel(app) else app.parallel
+    if int(workers) > 1:
+        start_render_pool(int(workers))
+
+
+def writes_in_parallel(app: Sphinx) -> bool:
+    # The check of Sphinx's builder, without warning about unsafe extensions
+    from sphinx.util.parallel import parallel_available
+
+    return (
+        parallel_available
+        and app.parallel > 1
+        and app.builder.allow_parallel
+        and all(ext.parallel_write_safe for ext in app.extensions.values())
+    )
+
+
+def env_updated(app: Sphinx, env: BuildEnvironment) -> None:
+    # Build the social card renderer before Sphinx forks its parallel writers,
+    # so that they share it copy-on-write instead of each building their own.
+    social_card_user_options = app.config.ogp_social_cards or {}
+    if (
+        app.parallel <= 1
+        or app.config.ogp_image
+        or app.config.ogp_use_first_image
+        or social_card_user_options.get('enable') is False
+        or app.builder.format != 'html'
+    ):
+        return
+
+    from sphinxext.opengraph._social_cards import (
+        DEFAULT_SOCIAL_CONFIG,
+        prewarm_renderer,
+    )
+
+    config_social = DEFAULT_SOCIAL_CONFIG.copy()
+    config_social.update(social_card_user_options)
+    prewarm_renderer(
+        config_social,
+        srcdir=app.srcdir,
+        doctreedir=env.doctreedir,
+        html_logo=app.config.html_logo,
+        required=app.config.ogp_social_cards is not None,
+    )
+
+
+def build_finished(app: Sphinx, exception: Exception | None) -> None:
+    # Nothing to do if no social cards were made
+    if social_cards := sys.modules.get('sphinxext.opengraph._social_cards'):
+        social_cards.finish_render_pool(cancel=exception is not None)
+        social_cards.finish_card_writer()
+        if exception is None:
+            social_cards.finish_awaited_cards()
+        social_cards.close_renderers()
+        if exception is None and app.builder.format == 'html':
+            config_social = social_cards.DEFAULT_SOCIAL_CONFIG.copy()
+            config_social.update(app.config.ogp_social_cards or {})
+            social_cards.cleanup_cards(
+                config_social,
+                outdir=app.outdir,
+                doctreedir=app.doctreedir,
+                all_docs=set(app.env.all_docs),
+            )
+            social_cards.write_card_manifest(
+                config_social, srcdir=app.srcdir, outdir=app.outdir
+            )
+            social_cards.save_fallback_cards(app.outdir, doctreedir=app.doctreedir)
+        social_cards.finish_card_cache()
+        social_cards.clear_card_index()
+
+
 def get_tags(
     context: dict[str, Any],
     doctree: nodes.document,
@@ -88,10 +180,12 @@ def get_tags(
         fields = {}
 
     if 'ogp_disable' in fields:
+        reference_social_cards(context['pagename'], [], env=env)
         return ''
 
     tags = {}
     meta_tags = {}  # For non-og meta tags
+    extra_image_tags = []  # For further images, after the first og:image
 
     # Set length of description
     try:
@@ -161,42 +255,81 @@ def get_tags(
     # Decide whether to add social media card images for each page.
     # Only do this as a fallback if the user hasn't given any configuration
     # to add other images.
-    config_social = DEFAULT_SOCIAL_CONFIG.copy()
     social_card_user_options = config.ogp_social_cards or {}
-    config_social.update(social_card_user_options)
     if (
         not (image_url or ogp_use_first_image)
-        and config_social.get('enable') is not False
-        and create_social_card is not None
+        and social_card_user_options.get('enable') is not False
     ):
-        image_url = social_card_for_page(
+        # The social card machinery is only loaded once a page needs a card
+        from sphinxext.opengraph._social_cards import (
+            DEFAULT_SOCIAL_CONFIG,
+            PAGE_OPTIONS,
+            shared_card_for_page,
+        )
+
+        config_social = DEFAULT_SOCIAL_CONFIG.copy()
+        config_social.update(social_card_user_options)
+        # Page metadata overrides the style of the card for this page
+        for option in PAGE_OPTIONS:
+            if f'ogp_social_cards_{option}' in fields:
+                config_social[option] = fields[f'ogp_social_cards_{option}']
+
+        # Pages of a section may share one card, with the section's text
+        card_title, card_description = title, description
+        if shared_card := shared_card_for_page(config_social, context['pagename']):
+            card_title, card_description = shared_card
+        social_cards = social_card_for_page(
             config_social=config_social,
             site_name=site_name,
-            title=title,
-            description=description,
-            pagename=context['pagename'],
+            title=card_title,
+            description=card_description,
             ogp_site_url=ogp_site_url,
             ogp_canonical_url=ogp_canonical_url,
+            docname=context['pagename'],
             srcdir=srcdir,
             outdir=outdir,
             config=config,
             env=env,
         )
+    else:
+        social_cards = None
+    reference_social_cards(context['pagename'], social_cards or [], env=env)
+
+    if social_cards:
+        (card_variant, image_url), *other_cards = social_cards
         ogp_use_first_image = False
 
-        # Alt text is taken from description unless given
+        # Alt text is taken from the card's description unless given
         if 'og:image:alt' in fields:
             ogp_image_alt = fields.get('og:image:alt')
         else:
-            ogp_image_alt = description
+            ogp_image_alt = card_description
 
         # If the social card objects have been added we add special metadata for them
-        # These are the dimensions *in pixels* of the card
-        # They were chosen by looking at the image pixel dimensions on disk
-        tags['og:image:width'] = '1146'
-        tags['og:image:height'] = '600'
+        # These are the dimensions *in pixels* of the card made by the renderer
+        width, height = card_variant.size
+        tags['og:image:width'] = str(width)
+        tags['og:image:height'] = str(height)
+        card_type = IMAGE_MIME_TYPES[Path(urlparse(image_url).path).suffix[1:]]
+        tags['og:image:type'] = card_type
         meta_tags['twitter:card'] = 'summary_large_image'
 
+        # Twitter is given its own card, other variants are offered as
+        # further images, each followed by its own structured properties
+        for variant, variant_url in other_cards:
+            if variant.name.partition('@')[0] == 'twitter':
+                meta_tags['twitter:image'] = variant_url
+                meta_tags['twitter:image:alt'] = ogp_image_alt
+                continue
+            width, height = variant.size
+            extra_image_tags += [
+                make_tag('og:image', variant_url),
+                make_tag('og:image:width', str(width)),
+                make_tag('og:image:height', str(height)),
+                make_tag('og:image:type', card_type),
+                make_tag('og:image:alt', ogp_image_alt),
+            ]
+
     fields.pop('og:image:alt', None)
 
     first_image = None
@@ -242,6 +375,7 @@ def get_tags(
     return (
         '\n'.join(
             [make_tag(p, c) for p, c in tags.items()]
+            + extra_image_tags
             + [make_tag(p, c, 'name') for p, c in meta_tags.items()]
             + list(config.ogp_custom_meta_tags)
         )
@@ -269,26 +403,25 @@ def social_card_for_page(
     site_name: str,
     title: str,
     description: str,
-    pagename: str,
     ogp_site_url: str,
     ogp_canonical_url: str,
     *,
+    docname: str | None = None,
     srcdir: str | Path,
     outdir: str | Path,
     config: Config,
     env: BuildEnvironment,
-) -> str:
-    # Description
-    description_max_length = config_social.get(
-        'description_max_length', DEFAULT_DESCRIPTION_LENGTH_SOCIAL_CARDS - 3
-    )
-    if len(description) > description_max_length:
-        description = description[:description_max_length].strip() + '...'
+) -> list[tuple[CardVariant, str]] | None:
+    # Description, cut to a number of characters only if configured
+    description_max_length = config_social.get('description_max_length')
+    if description_max_length is not None:
+        if len(description) > description_max_length:
+            description = description[:description_max_length].strip() + '...'
+    else:
+        description = description[:DEFAULT_DESCRIPTION_LENGTH_SOCIAL_CARDS]
 
     # Page title
-    pagetitle = title
-    if len(pagetitle) > DEFAULT_PAGE_LENGTH_SOCIAL_CARDS:
-        pagetitle = pagetitle[:DEFAULT_PAGE_LENGTH_SOCIAL_CARDS] + '...'
+    pagetitle = title[:DEFAULT_PAGE_LENGTH_SOCIAL_CARDS]
 
     # Site URL
     site_url = config_social.get('site_url', True)
@@ -297,22 +430,42 @@ def social_card_for_page(
     elif isinstance(site_url, str):
         url_text = site_url
 
-    # Plot an image with the given metadata to the output path
-    image_path = create_social_card(
+    from sphinxext.opengraph._social_cards import create_social_card
+
+    # Plot the images with the given metadata to the output path
+    cards = create_social_card(
         config_social,
         site_name,
         pagetitle,
         description,
         url_text,
-        pagename,
         srcdir=srcdir,
         outdir=outdir,
         env=env,
         html_logo=config.html_logo,
+        docname=docname,
+        # Cards are made by default, so only warn if the user asked for them
+        required=config.ogp_social_cards is not None,
     )
 
-    # Link the image in our page metadata
-    return posixpath.join(ogp_site_url, image_path.as_posix())
+    if cards is None:
+        return None
+
+    # Link the images in our page metadata
+    return [
+        (variant, posixpath.join(ogp_site_url, image_path.as_posix()))
+        for variant, image_path in cards
+    ]
+
+
+def reference_social_cards(
+    pagename: str, cards: list[tuple[CardVariant, str]], *, env: BuildEnvironment
+) -> None:
+    # Record the cards linked by the page, so that unused ones can be removed
+    if social_cards := sys.modules.get('sphinxext.opengraph._social_cards'):
+        prefix = f'{social_cards.CARD_DIRECTORY.as_posix()}/'
+        names = [urlparse(url).path.partition(prefix)[2] for _, url in cards]
+        social_cards.reference_cards(pagename, names, doctreedir=env.doctreedir)
 
 
 def make_tag(property: str, content: str, type_: str = 'property') -> str:
@@ -339,9 +492,16 @@ def setup(app: Sphinx) -> ExtensionMetadata:
     # Main Sphinx OpenGraph linking
     app.connect('html-page-context', html_page_context)
 
+    # Background rendering of social cards
+    app.connect('builder-inited', builder_inited)
+    app.connect('env-updated', env_updated)
+    app.connect('build-finished', build_finished)
+
     return {
         'version': __version__,
-        'env_version': 1,
+        # Increased to drop environments that still hold the Matplotlib figure
+        # that earlier versions stored as ``env.ogp_social_card_plt_objects``
+        'env_version': 2,
         'parallel_read_safe': True,
         'parallel_write_safe': True,
     }
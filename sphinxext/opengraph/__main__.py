@@ -0,0 +1,99 @@
+"""Render the social cards listed in a manifest written by a Sphinx build.
+
+Set the ``manifest`` key of ``ogp_social_cards`` for the build to leave its
+cards to this command, which can be split over several machines::
+
+    python -m sphinxext.opengraph docs/_build/cards.json --shard 1/4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a shard such as ``2/4``, the second of four."""
+    index, _, count = value.partition('/')
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        msg = f'expected a shard such as 1/4, not {value!r}'
+        raise argparse.ArgumentTypeError(msg) from None
+    if not 1 <= shard[0] <= shard[1]:
+        msg = f'the shard must be between 1 and {shard[1]}, not {shard[0]}'
+        raise argparse.ArgumentTypeError(msg)
+    return shard
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m sphinxext.opengraph',
+        description='Render the social cards listed in a manifest.',
+    )
+    parser.add_argument('manifest', type=Path, help='the manifest written by Sphinx')
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        default=(1, 1),
+        metavar='I/N',
+        help='only render the I-th of N equal parts of the cards',
+    )
+    parser.add_argument(
+        '--outdir',
+        type=Path,
+        help='write the cards here instead of the output directory of the build',
+    )
+    parser.add_argument(
+        '--srcdir',
+        type=Path,
+        help='find the images and fonts of the cards here instead of the '
+        'source directory of the build',
+    )
+    args = parser.parse_args(argv)
+
+    from sphinxext.opengraph._social_cards import (
+        MANIFEST_VERSION,
+        close_renderers,
+        render_manifest_job,
+    )
+
+    manifest = json.loads(args.manifest.read_text(encoding='utf-8'))
+    if manifest.get('version') != MANIFEST_VERSION:
+        print(
+            f'Unsupported manifest version: {manifest.get("version")}', file=sys.stderr
+        )
+        return 2
+    # Directories are stored relative to the manifest
+    outdir = args.outdir or args.manifest.parent / manifest['outdir']
+    srcdir = args.srcdir or args.manifest.parent / manifest['srcdir']
+
+    # Jobs are sorted in the manifest, so every machine picks the same parts
+    index, count = args.shard
+    jobs = manifest['jobs'][index - 1 :: count]
+    start = time.perf_counter()
+    rendered = failed = 0
+    try:
+        for job in jobs:
+            try:
+                rendered += render_manifest_job(job, outdir, srcdir=srcdir)
+            except Exception as exc:  # NoQA: BLE001, PERF203
+                print(
+                    f'Failed to render the card of {job["page"]}: {exc}',
+                    file=sys.stderr,
+                )
+                failed += 1
+    finally:
+        close_renderers()
+    print(
+        f'Rendered {rendered} of {len(jobs)} cards '
+        f'in {time.perf_counter() - start:.1f}s to {outdir}'
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Share rendered cards between builds through a directory of finished cards."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+
+class CardCache:
+    """A directory of cards, named by the fingerprint of their content.
+
+    Cards are hard-linked in and out of the cache where the file system allows,
+    and copied otherwise. Using a card marks it as recently used, so that
+    :meth:`trim` removes the cards that have gone unused the longest.
+    """
+
+    def __init__(self, root: Path, max_size: int) -> None:
+        self.root = root
+        #: The size in bytes that :meth:`trim` keeps the cache under
+        self.max_size = max_size
+        #: The number of cards found in and missing from the cache
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, name: str) -> Path:
+        """Get the path in the cache of the card file called *name*."""
+        # Spread the cards over directories by the start of their fingerprint
+        return self.root / name.removeprefix('summary_')[:2] / name
+
+    def fetch(self, paths: list[Path]) -> bool:
+        """Fill in the cards at *paths* from the cache.
+
+        Returns True if all of them were found, counting a hit,
+        or else False and a miss, leaving any cards found in place.
+        """
+        for path in paths:
+            path_cached = self.path(path.name)
+            try:
+                # Mark the card as used, before the cache can evict it
+                os.utime(path_cached)
+                _place(path_cached, path)
+            except FileNotFoundError:
+                self.misses += 1
+                return False
+        self.hits += 1
+        return True
+
+    def store(self, path: Path) -> None:
+        """Add the card at *path* to the cache."""
+        path_cached = self.path(path.name)
+        # The cache is only an optimisation, a failure to write it is not an error
+        with contextlib.suppress(OSError):
+            path_cached.parent.mkdir(parents=True, exist_ok=True)
+            _place(path, path_cached)
+
+    def trim(self) -> int:
+        """Delete the least recently used cards until the cache fits its size.
+
+        Returns the number of cards deleted.
+        """
+        cards = []
+        total = 0
+        with contextlib.suppress(FileNotFoundError), os.scandir(self.root) as dirs:
+            for entry_dir in dirs:
+                if not entry_dir.is_dir(follow_symlinks=False):
+                    continue
+                with os.scandir(entry_dir.path) as entries:
+                    for entry in entries:
+                        stat = entry.stat(follow_symlinks=False)
+                        cards.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+                        total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(cards):
+            if total <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+            total -= size
+            removed += 1
+        return removed
+
+
+def _place(src: Path, dst: Path) -> None:
+    # Link or copy next to the destination first and then rename,
+    # so that a card is never seen half written
+    tmp = dst.with_name(f'.{dst.name}.{os.getpid()}-{threading.get_ident()}.tmp')
+    try:
+        try:
+            os.link(src, tmp)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Hard links don't cross file systems, and not all of them have them
+            shutil.copyfile(src, tmp)
+        tmp.replace(dst)
+    finally:
+        tmp.unlink(missing_ok=True)
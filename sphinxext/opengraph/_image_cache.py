@@ -0,0 +1,59 @@
+"""Decode the images of a card once, scaled to the box they are drawn in."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Images already scaled by this process, keyed by content hash and box size
+_fitted: dict[tuple[str, tuple[int, int]], Image.Image] = {}
+
+
+def load_fitted_image(
+    path: Path, box: tuple[int, int], *, cache_dir: Path | None = None
+) -> Image.Image:
+    """Load the image at *path* scaled to fit in *box*, keeping its aspect ratio.
+
+    The scaled image is kept in memory and, if *cache_dir* is given, on disk,
+    named by the hash of the file's contents, so a large logo is only decoded
+    and resampled the first time it is seen at each size.
+    Returns an RGBA image no larger than *box* in either direction.
+    """
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    key = digest, box
+    if (img := _fitted.get(key)) is not None:
+        return img
+
+    path_cached = None
+    if cache_dir is not None:
+        path_cached = cache_dir / f'{digest[:32]}_{box[0]}x{box[1]}.png'
+        if path_cached.is_file():
+            with Image.open(path_cached) as src:
+                img = _fitted[key] = src.convert('RGBA')
+            return img
+
+    with Image.open(path) as src:
+        # Let the decoder skip detail that would be thrown away, where it can
+        src.draft('RGBA', box)
+        img = src.convert('RGBA')
+    scale = min(box[0] / img.width, box[1] / img.height)
+    size = max(1, round(img.width * scale)), max(1, round(img.height * scale))
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    _fitted[key] = img
+
+    if path_cached is not None:
+        # The cache is only an optimisation, a failure to write it is not an error
+        with contextlib.suppress(OSError):
+            path_cached.parent.mkdir(parents=True, exist_ok=True)
+            path_tmp = path_cached.with_name(f'{path_cached.name}.{os.getpid()}.tmp')
+            img.save(path_tmp, format='PNG')
+            path_tmp.replace(path_cached)
+    return img
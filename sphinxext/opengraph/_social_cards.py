@@ -1,33 +1,109 @@
-"""Build a PNG card for each page meant for social media."""
+"""Build an image card for each page meant for social media."""
 
 from __future__ import annotations
 
+import abc
+import contextlib
+import fnmatch
 import hashlib
+import importlib
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import signal
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
-import matplotlib as mpl
-import matplotlib.font_manager
-import matplotlib.image as mpimg
-from matplotlib import pyplot as plt
+from sphinx.errors import ConfigError
 from sphinx.util import logging
 
 if TYPE_CHECKING:
-    from typing import TypeAlias
+    from collections.abc import Iterator, Sequence
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from multiprocessing.sharedctypes import Synchronized
+    from typing import ClassVar
 
-    from matplotlib.figure import Figure
-    from matplotlib.text import Text
+    from PIL import Image
     from sphinx.environment import BuildEnvironment
 
-    PltObjects: TypeAlias = tuple[Figure, Text, Text, Text, Text]
-
-mpl.use('agg')
+    from sphinxext.opengraph._card_cache import CardCache
+    from sphinxext.opengraph._text_layout import TextLayout
 
 LOGGER = logging.getLogger(__name__)
 HERE = Path(__file__).parent
 MAX_CHAR_PAGE_TITLE = 75
 MAX_CHAR_DESCRIPTION = 175
 
+# Size in pixels of the cards that can be selected by name in ``variants``
+CARD_VARIANTS = {
+    # OpenGraph, roughly 1.91:1
+    'opengraph': (1146, 600),
+    # Twitter's summary_large_image, 2:1
+    'twitter': (1200, 600),
+    # Chat apps that show a square thumbnail
+    'square': (600, 600),
+}
+
+# Where the cards are written, relative to the output directory
+CARD_DIRECTORY = Path('_images/social_previews')
+
+# File extension of each output format
+CARD_FORMATS = {
+    'png': 'png',
+    'png-quantized': 'png',
+    'webp': 'webp',
+    'jpeg': 'jpg',
+}
+# Quality of the lossy formats when none is configured
+DEFAULT_QUALITY = 90
+
+# The number of card templates (renderers) kept by each process
+TEMPLATE_CACHE_SIZE = 8
+
+# Options of ``ogp_social_cards`` that a page can override in its metadata,
+# with a field such as ``:ogp_social_cards_image:``
+PAGE_OPTIONS = ('image', 'image_mini', 'line_color', 'background_color', 'font')
+# Options that the figure arguments of a renderer are made from
+STYLE_OPTIONS = (*PAGE_OPTIONS, 'text_color', 'cache_dir')
+
+# Seconds after which the lock of a card being rendered by another build,
+# which may have been killed, is taken over
+CARD_LOCK_TIMEOUT = 60
+
+# The number of rendered cards that may wait to be written to disk
+WRITE_QUEUE_SIZE = 32
+
+# Size in megabytes that the cache of cards shared between builds is kept under
+CARD_CACHE_SIZE = 500
+
+# Scale of the cards rendered in draft mode, and the environment variable
+# that sets the mode for a single build
+DRAFT_SCALE = 0.25
+DRAFT_ENVIRON = 'OGP_SOCIAL_CARDS_DRAFT'
+
+# Card text is set in points at 100 DPI
+POINTS_TO_PIXELS = 100 / 72
+
+# Font size in points, wrapping width in pixels and maximum number of lines
+# of the page title and the description.
+# The title must not run into the description below it.
+PAGE_TITLE_LAYOUT = 46, 825, 3
+DESCRIPTION_LAYOUT = 17, 1000, 2
+# Space kept between the page title and the logo, as a fraction of the width
+LOGO_GAP = 0.02
+
+# Part of the fingerprint of every card, to be increased whenever a change
+# to the layout or drawing code changes how existing cards look
+LAYOUT_VERSION = 2
+
+# Format of the manifest of cards to render outside of the build
+MANIFEST_VERSION = 2
+
 # Default configuration for this functionality
 DEFAULT_SOCIAL_CONFIG = {
     'enable': True,
@@ -35,9 +111,40 @@ DEFAULT_SOCIAL_CONFIG = {
     'site_title': True,
     'page_title': True,
     'description': True,
+    'renderer': 'matplotlib',
+    'workers': None,
+    'format': 'png',
+    'quality': None,
+    'variants': None,
+    'cache_dir': None,
+    'cache_max_size': CARD_CACHE_SIZE,
+    'template_cache_size': TEMPLATE_CACHE_SIZE,
+    'shared': None,
+    'cleanup': True,
+    'shard_levels': 0,
+    'render_timeout': None,
+    'render_budget': None,
+    'draft': False,
+    'manifest': None,
 }
 
 
+class CardVariant(NamedTuple):
+    """The shape of one of the cards made for each page."""
+
+    name: str
+    #: The dimensions of the card in pixels, before scaling for high-DPI screens
+    width: int
+    height: int
+    #: Multiplies the dimensions of the image, below 1 for draft cards
+    scale: float = 1
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """The dimensions of the image in pixels."""
+        return round(self.width * self.scale), round(self.height * self.scale)
+
+
 # Default configuration for the figure style
 DEFAULT_KWARGS_FIG = {
     'enable': True,
@@ -51,41 +158,488 @@ def create_social_card(
     page_title: str,
     description: str,
     url_text: str,
-    page_path: str,
     *,
     srcdir: str | Path,
     outdir: str | Path,
     env: BuildEnvironment,
     html_logo: str | None = None,
-) -> Path:
-    """Create a social preview card according to page metadata.
+    docname: str | None = None,
+    required: bool = True,
+) -> list[tuple[CardVariant, Path]] | None:
+    """Create the social preview cards according to page metadata.
 
-    This uses page metadata and calls a render function to generate the image.
+    This uses page metadata and calls a render function to generate the images,
+    one for each of the configured variants, from a single layout of the text.
+    Cards are named by a fingerprint of their content, so pages with the same
+    text and style share one file, which is only rendered once.
     It also passes configuration through to the rendering function.
-    If Matplotlib objects are present in the `app` environment, it reuses them.
+    Renderers are kept by this process for re-use, see :func:`close_renderers`.
+    If the card of the page *docname* fails to render, takes longer than
+    ``render_timeout`` seconds, or the build has used up its ``render_budget``,
+    the page gets the default card of the site instead, with a warning.
+    Returns the variants and the paths of their images relative to *outdir*,
+    or None if the dependencies of the configured renderer are missing,
+    which is a warning if the cards are *required*, see :func:`get_renderer`.
     """
-    # Add a hash to the image path based on metadata to bust caches
+    renderer_name = config_social.get('renderer', 'matplotlib')
+    renderer_cls = get_renderer(renderer_name, required=required)
+    if renderer_cls is None:
+        return None
+    encoding = card_encoding(config_social)
+    variants = card_variants(config_social)
+    draft = draft_mode(config_social)
+    cache_size = config_social.get('template_cache_size') or TEMPLATE_CACHE_SIZE
+    timeout = config_social.get('render_timeout')
+    if timeout is not None:
+        timeout = float(timeout) if docname is not None else None
+    kwargs_fig, style, problems = card_style(
+        renderer_name,
+        config_social,
+        srcdir=srcdir,
+        doctreedir=env.doctreedir,
+        html_logo=html_logo,
+    )
+
+    # Name the images by a fingerprint of everything drawn on them.
+    # This also busts caches when a card changes.
     # ref: https://developer.twitter.com/en/docs/twitter-for-websites/cards/guides/troubleshooting-cards#refreshing_images
-    hash = hashlib.sha1(
-        (site_name + page_title + description + str(config_social)).encode(),
+    # The rest of the configuration, such as the timeouts or where files go,
+    # doesn't change the image and so is left out, as is the draft mode itself:
+    # draft cards differ by the scale of their variants, and skipped drafts
+    # link to the card a full build will make.
+    fingerprint = hashlib.sha1(
+        repr(
+            (
+                style,
+                encoding,
+                [tuple(variant) for variant in variants],
+                site_name,
+                page_title,
+                description,
+                url_text,
+            )
+        ).encode(),
         usedforsecurity=False,
-    ).hexdigest()[:8]
+    ).hexdigest()[:16]
 
-    # Define the file path we'll use for this image
-    path_images_relative = Path('_images/social_previews')
-    filename_image = f'summary_{page_path.replace("/", "_")}_{hash}.png'
+    # Define the file paths we'll use for the images,
+    # the first variant is the main card and keeps the plain name
+    path_images_relative = CARD_DIRECTORY / card_shard(
+        fingerprint, int(config_social.get('shard_levels') or 0)
+    )
+    extension = CARD_FORMATS[encoding[0]]
+    stem = f'summary_{fingerprint}'
+    paths_relative = [
+        path_images_relative / f'{stem}.{extension}',
+        *(
+            path_images_relative
+            / f'{stem}_{variant.name.replace("@", "-")}.{extension}'
+            for variant in variants[1:]
+        ),
+    ]
+    cards = list(zip(variants, paths_relative))
 
     # Absolute path used to save the image
     path_images_absolute = Path(outdir) / path_images_relative
-    path_images_absolute.mkdir(exist_ok=True, parents=True)
-    path_image = path_images_absolute / filename_image
+    paths_image = [Path(outdir) / path for path in paths_relative]
 
-    # If the image already exists then we can just skip creating a new one.
+    # If the images already exist then we can just skip creating new ones.
     # This is because we hash the values of the text + images in the social card.
     # If the hash doesn't change, it means the output should be the same.
-    if path_image.exists():
-        return path_images_relative / filename_image
+    # The index also has the cards of earlier pages still waiting to be written,
+    # named by their path in the card directory.
+    card_index = _card_indexes.get(Path(outdir) / CARD_DIRECTORY)
+    if card_index is None:
+        card_index = load_card_index(outdir, doctreedir=env.doctreedir)
+    names = [path.relative_to(CARD_DIRECTORY).as_posix() for path in paths_relative]
+    if draft == 'skip' or all(name in card_index for name in names):
+        return cards
+    card_index.update(names)
+    if path_images_absolute not in _card_dirs:
+        path_images_absolute.mkdir(parents=True, exist_ok=True)
+        _card_dirs.add(path_images_absolute)
+
+    # Another build may already have rendered the same cards
+    if _card_cache is not None and _card_cache.fetch(paths_image):
+        return cards
+
+    # Report problems with the images once, when the first card using them is made
+    while problems:
+        LOGGER.warning(problems.pop(0))
+
+    def fall_back(reason: object) -> list[tuple[CardVariant, Path]] | None:
+        LOGGER.warning(
+            '[Social card] using the default card for %s: %s',
+            docname,
+            reason,
+            location=docname,
+        )
+        card_index.difference_update(names)
+        return create_social_card(
+            config_social,
+            site_name,
+            '',
+            '',
+            url_text,
+            srcdir=srcdir,
+            outdir=outdir,
+            env=env,
+            html_logo=html_logo,
+        )
+
+    # Leave the cards to be rendered outside of the build
+    if config_social.get('manifest'):
+        # Files are given as configured, relative to the source directory,
+        # so that the cards can be rendered from another checkout
+        _manifest_jobs[paths_relative[0].as_posix()] = {
+            'page': docname,
+            'renderer': renderer_name,
+            'style': {option: config_social.get(option) for option in STYLE_OPTIONS},
+            'html_logo': html_logo,
+            'variants': [list(variant) for variant in variants],
+            'encoding': list(encoding),
+            'paths': [path.as_posix() for path in paths_relative],
+            'site_name': site_name,
+            'page_title': page_title,
+            'description': description,
+            'url_text': url_text,
+        }
+        return cards
+
+    budget = config_social.get('render_budget')
+    if (
+        docname is not None
+        and budget is not None
+        and spent_render_time() >= float(budget)
+    ):
+        return fall_back(f'the render budget of {budget} seconds is used up')
+
+    # Another build sharing the output directory may be rendering the same card,
+    # wait for it rather than render the card a second time
+    lock = card_lock_path(paths_image[0])
+    if not acquire_card_lock(lock):
+        job = (
+            renderer_name,
+            kwargs_fig,
+            variants,
+            cache_size,
+            paths_image,
+            encoding,
+            site_name,
+            page_title,
+            description,
+            url_text,
+        )
+        if multiprocessing.parent_process() is None:
+            _awaited_cards.append(job)
+        else:
+            _await_card(job)
+        return cards
+
+    # Hand the card over to the render pool if one is running in this process.
+    # The page links to the final path straight away, the file follows later.
+    if _render_pool is not None and _render_pool.submit(
+        renderer_name,
+        kwargs_fig,
+        variants,
+        cache_size,
+        paths_image,
+        encoding,
+        site_name,
+        page_title,
+        description,
+        url_text,
+        timeout=timeout,
+        docname=docname,
+    ):
+        return cards
+
+    # Generate the images, re-using the renderers from earlier pages if possible,
+    # and leave encoding and writing them to the writer thread
+    start = time.perf_counter()
+    try:
+        with time_limit(timeout):
+            renderers = get_card_renderers(
+                renderer_name, kwargs_fig, variants, cache_size
+            )
+            images = render_cards(
+                renderers, site_name, page_title, description, url_text
+            )
+    except Exception as exc:
+        release_card_lock(lock)
+        # A mistake in the configuration affects every card, so stop the build
+        if docname is None or isinstance(exc, ConfigError):
+            raise
+        # A timeout can stop a renderer half way through updating its state
+        discard_renderers(renderer_name, kwargs_fig, variants)
+        return fall_back(exc)
+    finally:
+        add_render_time(time.perf_counter() - start)
+    for image, path_image in zip(images, paths_image):
+        # The lock is released once the last of the images is written
+        is_last = path_image is paths_image[-1]
+        write_social_card(image, path_image, encoding, lock=lock if is_last else None)
+
+    # Paths relative to build folder will be what we use for linking the URL
+    return cards
+
+
+@contextlib.contextmanager
+def time_limit(seconds: float | None) -> Iterator[None]:
+    """Raise :exc:`TimeoutError` if the block takes longer than *seconds*.
+
+    In the main thread of a process, the block is interrupted by a timer signal
+    where the platform has one. Elsewhere the error is raised once it ends.
+    """
+    if seconds is None:
+        yield
+        return
+
+    def on_alarm(signum: int, frame: object) -> None:
+        raise TimeoutError(msg)
+
+    msg = f'rendering took longer than {seconds} seconds'
+    interrupt = (
+        hasattr(signal, 'setitimer')
+        and threading.current_thread() is threading.main_thread()
+    )
+    if interrupt:
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if interrupt:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    if time.perf_counter() - start > seconds:
+        raise TimeoutError(msg)
+
+
+def style_fingerprint(
+    renderer_name: str, kwargs_fig: dict[str, str | Path | None]
+) -> str:
+    """Get a fingerprint of everything that a card looks like apart from its text.
+
+    This covers the renderer and the versions of the packages that draw
+    and encode the card, and the figure arguments, with the image and font
+    files they refer to hashed by their contents rather than their paths,
+    so that cards keep their names in another checkout of the project.
+    The directory of scaled images is left out, as it doesn't change the card.
+    Fingerprints are kept until :func:`close_renderers` is called at the end
+    of the build, so that each file is only hashed once per build.
+    """
+    key = renderer_name, tuple(sorted(kwargs_fig.items()))
+    if (fingerprint := _style_fingerprints.get(key)) is not None:
+        return fingerprint
+
+    from sphinxext.opengraph import __version__
+
+    # The versions of the modules themselves, as the distributions may have
+    # other names, such as Pillow-SIMD
+    versions = [
+        importlib.import_module(module).__version__
+        for module in RENDERER_PACKAGES[renderer_name]
+    ]
+    style = sorted(
+        (name, asset_digest(value) if isinstance(value, Path) else value)
+        for name, value in kwargs_fig.items()
+        if name != 'cache_dir'
+    )
+    fingerprint = _style_fingerprints[key] = hashlib.sha1(
+        repr(
+            (
+                LAYOUT_VERSION,
+                __version__,
+                renderer_name,
+                versions,
+                style,
+            )
+        ).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return fingerprint
+
+
+def asset_digest(path: Path) -> str:
+    """Get the hash of the contents of the file at *path*.
+
+    Hashes are kept with the size and modification time of the file,
+    and only computed again when either of them changes.
+    An empty string is returned for a file that doesn't exist.
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return ''
+    cached = _asset_digests.get(path)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _asset_digests[path] = stat.st_size, stat.st_mtime_ns, digest
+    return digest
+
+
+# Fingerprints of the style of the cards of this build, and the hashes of
+# image and font files with the size and modification time they were taken at
+_style_fingerprints: dict[tuple, str] = {}
+_asset_digests: dict[Path, tuple[int, int, str]] = {}
+
+
+def card_shard(fingerprint: str, levels: int) -> str:
+    """Get the subdirectory of the card with *fingerprint*.
+
+    Each level is named by the next two hex digits of the fingerprint,
+    so ``levels=2`` spreads cards over 65536 directories, such as ``3f/a0``.
+    """
+    return '/'.join(fingerprint[2 * level : 2 * level + 2] for level in range(levels))
+
+
+def shared_card_for_page(
+    config_social: dict[str, bool | str], pagename: str
+) -> tuple[str, str] | None:
+    """Find the card shared by a section of the site that *pagename* belongs to.
+
+    ``shared`` maps glob patterns of document names, such as ``api/*``,
+    to the ``title`` and ``description`` shown on the card of all matching pages.
+    The first matching pattern wins.
+    Returns the title and description of the card,
+    or None if the page gets its own card.
+    """
+    for pattern, card in (config_social.get('shared') or {}).items():
+        if fnmatch.fnmatchcase(pagename, pattern):
+            return card.get('title', ''), card.get('description', '')
+    return None
+
+
+def card_encoding(config_social: dict[str, bool | str]) -> tuple[str, int | None]:
+    """Get the output format and quality of the cards from the configuration."""
+    card_format = config_social.get('format') or 'png'
+    if card_format not in CARD_FORMATS:
+        msg = (
+            f'Unknown social card format {card_format!r}, '
+            f'expected one of {", ".join(map(repr, CARD_FORMATS))}'
+        )
+        raise ValueError(msg)
+    quality = config_social.get('quality')
+    return card_format, None if quality is None else int(quality)
+
+
+def card_variants(config_social: dict[str, bool | str]) -> list[CardVariant]:
+    """Get the variants of the card to make for each page from the configuration.
+
+    ``variants`` is either a list of names or a mapping of names to a dictionary
+    with any of ``width``, ``height`` and ``scale``.
+    A name is one of :data:`CARD_VARIANTS`, optionally followed by the scale,
+    such as ``opengraph@2x``. Other names must give both a width and a height.
+    Draft cards are scaled down by :data:`DRAFT_SCALE`.
+    """
+    variants = config_social.get('variants') or ['opengraph']
+    if not isinstance(variants, dict):
+        variants = dict.fromkeys(variants)
+
+    card_variants = []
+    for name, options in variants.items():
+        sizes = options or {}
+        base, _, scale = name.partition('@')
+        width, height = CARD_VARIANTS.get(base, (None, None))
+        width = sizes.get('width', width)
+        height = sizes.get('height', height)
+        if width is None or height is None:
+            msg = (
+                f'Social card variant {name!r} needs a width and a height, '
+                f'or must be one of: {", ".join(CARD_VARIANTS)}'
+            )
+            raise ValueError(msg)
+        scale = sizes.get('scale', int(scale.removesuffix('x')) if scale else 1)
+        if draft_mode(config_social) is True:
+            scale *= DRAFT_SCALE
+        card_variants.append(CardVariant(name, int(width), int(height), float(scale)))
+    return card_variants
+
 
+def draft_mode(config_social: dict[str, bool | str]) -> bool | str:
+    """Get the draft mode of the cards, for quick builds such as live previews.
+
+    This is the ``draft`` key of the configuration, unless overridden by the
+    :envvar:`OGP_SOCIAL_CARDS_DRAFT` environment variable. It is either False
+    for full cards, True for cards at a fraction of their resolution,
+    or ``"skip"`` to link to the cards without rendering them.
+    """
+    draft = os.environ.get(DRAFT_ENVIRON)
+    if draft is None:
+        draft = config_social.get('draft', False)
+    elif draft.lower() in {'', '0', 'false', 'no'}:
+        draft = False
+    elif draft.lower() != 'skip':
+        draft = True
+    if draft not in {False, True, 'skip'}:
+        msg = (
+            f'Unknown social card draft mode {draft!r}, expected True, False or "skip"'
+        )
+        raise ValueError(msg)
+    return draft
+
+
+def card_style(
+    renderer_name: str,
+    config_social: dict[str, bool | str],
+    *,
+    srcdir: str | Path,
+    doctreedir: str | Path | None = None,
+    html_logo: str | None = None,
+) -> tuple[dict[str, str | Path | None], str, list[str]]:
+    """Get the figure arguments of a card and the fingerprint of its style.
+
+    Both are worked out once for each combination of options in a build,
+    until :func:`close_renderers` is called, so that pages whose cards already
+    exist never touch the image files.
+    The problems found with the images are returned as a list of warnings,
+    left to the caller to report when a card is actually made.
+    """
+    key = (
+        renderer_name,
+        tuple(repr(config_social.get(option)) for option in STYLE_OPTIONS),
+        str(srcdir),
+        str(doctreedir),
+        html_logo,
+    )
+    if (style := _card_styles.get(key)) is None:
+        problems: list[str] = []
+        kwargs_fig = social_card_figure_kwargs(
+            config_social,
+            srcdir=srcdir,
+            doctreedir=doctreedir,
+            html_logo=html_logo,
+            problems=problems,
+        )
+        fingerprint = style_fingerprint(renderer_name, kwargs_fig)
+        style = _card_styles[key] = kwargs_fig, fingerprint, problems
+    return style
+
+
+# The figure arguments, style fingerprint and unreported problems of each
+# combination of options used by the cards of this build
+_card_styles: dict[tuple, tuple[dict[str, str | Path | None], str, list[str]]] = {}
+
+
+def social_card_figure_kwargs(
+    config_social: dict[str, bool | str],
+    *,
+    srcdir: str | Path,
+    doctreedir: str | Path | None = None,
+    html_logo: str | None = None,
+    problems: list[str] | None = None,
+) -> dict[str, str | Path | None]:
+    """Get the arguments used to create a renderer from the user configuration.
+
+    Scaled images are cached in the ``cache_dir`` given in the configuration,
+    relative to the source directory, or else in *doctreedir*.
+    Images that can't be used are left out with a warning,
+    or added to *problems* instead if it is given.
+    """
+    warnings = [] if problems is None else problems
     # These kwargs are used to generate the base figure image
     kwargs_fig: dict[str, str | Path | None] = {}
 
@@ -111,12 +665,12 @@ def create_social_card(
 
         # If image is an SVG replace it with None
         if impath.suffix.lower() == '.svg':
-            LOGGER.warning('[Social card] %s cannot be an SVG image, skipping...', img)
+            warnings.append(f'[Social card] {img} cannot be an SVG image, skipping...')
             kwargs_fig[img] = None
 
         # If image doesn't exist, throw a warning and replace with none
         if not impath.exists():
-            LOGGER.warning("[Social card]: %s file doesn't exist, skipping...", img)
+            warnings.append(f"[Social card]: {img} file doesn't exist, skipping...")
             kwargs_fig[img] = None
 
     # These are passed directly from the user configuration to our plotting function
@@ -125,196 +679,1073 @@ def create_social_card(
         if cs_config := config_social.get(config):
             kwargs_fig[config] = cs_config
 
-    # Generate the image and store the matplotlib objects so that we can re-use them
-    try:
-        plt_objects = env.ogp_social_card_plt_objects
-    except AttributeError:
-        # If objects is None it means this is the first time plotting.
-        # Create the figure objects and return them so that we re-use them later.
-        plt_objects = create_social_card_objects(**kwargs_fig)
-    plt_objects = render_social_card(
-        path_image,
-        site_name,
-        page_title,
-        description,
-        url_text,
-        plt_objects,
+    if cs_cache_dir := config_social.get('cache_dir'):
+        kwargs_fig['cache_dir'] = Path(srcdir) / cs_cache_dir
+    elif doctreedir is not None:
+        kwargs_fig['cache_dir'] = Path(doctreedir) / 'ogp_social_cards'
+
+    # A font file is given relative to the source directory,
+    # anything else is taken to be the name of an installed font
+    if (font := kwargs_fig.get('font')) and (Path(srcdir) / font).is_file():
+        kwargs_fig['font'] = Path(srcdir) / font
+
+    if problems is None:
+        for warning in warnings:
+            LOGGER.warning(warning)
+    return kwargs_fig
+
+
+class SocialCardRenderer(abc.ABC):
+    """Base class for the backends that draw social cards.
+
+    A renderer is created once from the figure keyword arguments
+    (images, colours and font) and then renders many cards,
+    so that the expensive set-up is shared between pages.
+    """
+
+    #: The name used to select the renderer in ``ogp_social_cards``
+    name: ClassVar[str]
+    #: The dimensions of the card in pixels, before scaling for high-DPI screens
+    width: int = CARD_VARIANTS['opengraph'][0]
+    height: int = CARD_VARIANTS['opengraph'][1]
+    #: Multiplies the dimensions of the rendered image
+    scale: float = 1
+    #: Measures text in the font used for the card
+    text_layout: TextLayout
+
+    def __init__(
+        self,
+        *,
+        width: int | None = None,
+        height: int | None = None,
+        scale: float = 1,
+    ) -> None:
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = height
+        self.scale = scale
+
+    def render(
+        self,
+        site_title: str,
+        page_title: str,
+        description: str,
+        siteurl: str,
+    ) -> Image.Image:
+        """Render a card with the given text into an RGBA image."""
+        page_title, description = self.layout(page_title, description)
+        return self.draw(site_title, page_title, description, siteurl)
+
+    @abc.abstractmethod
+    def draw(
+        self,
+        site_title: str,
+        page_title: str,
+        description: str,
+        siteurl: str,
+    ) -> Image.Image:
+        """Render a card with text already laid out by :meth:`layout`."""
+
+    def warm_up(self) -> None:  # NoQA: B027
+        """Fill any caches that are otherwise filled by the first render."""
+
+    def close(self) -> None:  # NoQA: B027
+        """Release the resources held by the renderer."""
+
+    def layout(self, page_title: str, description: str) -> tuple[str, str]:
+        """Wrap the page title and description to fit the card.
+
+        Returns the text with line breaks inserted, and an ellipsis added
+        to text that would otherwise run past its last allowed line.
+        """
+        return layout_cards([self], page_title, description)[0]
+
+
+def layout_cards(
+    renderers: Sequence[SocialCardRenderer], page_title: str, description: str
+) -> list[tuple[str, str]]:
+    """Wrap the page title and description for several cards in one pass.
+
+    The text is measured once for all of them, and cards of the same width
+    (such as the same card at a higher scale) share their layout.
+    The renderers must use the same font.
+    """
+    shapes = list(
+        dict.fromkeys((renderer.width, renderer.height) for renderer in renderers)
     )
-    env.ogp_social_card_plt_objects = plt_objects
+    texts, sizes, line_widths, max_lines = [], [], [], []
+    for width, height in shapes:
+        # Leave the left margin clear on the right-hand side too
+        max_width = 0.9 * width
+        for text, (size, wrap_width, lines), line_width in (
+            (page_title, PAGE_TITLE_LAYOUT, title_width(width, height)),
+            (description, DESCRIPTION_LAYOUT, max_width),
+        ):
+            texts.append(text)
+            sizes.append(size * POINTS_TO_PIXELS)
+            line_widths.append(min(wrap_width, line_width))
+            max_lines.append(lines)
 
-    # Path relative to build folder will be what we use for linking the URL
-    return path_images_relative / filename_image
+    wrapped = iter(renderers[0].text_layout.wrap(texts, sizes, line_widths, max_lines))
+    layouts = {
+        shape: ('\n'.join(next(wrapped)), '\n'.join(next(wrapped))) for shape in shapes
+    }
+    return [layouts[renderer.width, renderer.height] for renderer in renderers]
 
 
-def render_social_card(
-    path: Path,
+def title_width(width: int, height: int) -> float:
+    """Get the width the page title may take on a card of this size.
+
+    The title starts level with the logo in the top right, which the renderers
+    draw in a square of 0.3 times the shorter side, 0.05 of the width from the
+    right edge. The title ends a small gap short of it, after the left margin.
+    """
+    logo_left = 0.95 * width - 0.3 * min(width, height)
+    return logo_left - (0.05 + LOGO_GAP) * width
+
+
+def render_cards(
+    renderers: Sequence[SocialCardRenderer],
     site_title: str,
     page_title: str,
     description: str,
     siteurl: str,
-    plt_objects: PltObjects,
-) -> PltObjects:
-    """Render a social preview card with Matplotlib and write to disk."""
-    fig, txt_site_title, txt_page_title, txt_description, txt_url = plt_objects
-
-    # Update the matplotlib text objects with new text from this page
-    txt_site_title.set_text(site_title)
-    txt_page_title.set_text(page_title)
-    txt_description.set_text(description)
-    txt_url.set_text(siteurl)
-
-    # Save the image
-    fig.savefig(path, facecolor=None)
-    return fig, txt_site_title, txt_page_title, txt_description, txt_url
-
-
-def create_social_card_objects(
-    image: Path | None = None,
-    image_mini: Path | None = None,
-    page_title_color: str = '#2f363d',
-    description_color: str = '#585e63',
-    site_title_color: str = '#585e63',
-    site_url_color: str = '#2f363d',
-    background_color: str = 'white',
-    line_color: str = '#5A626B',
-    font: str | None = None,
-) -> PltObjects:
-    """Create the Matplotlib objects for the first time."""
-    # If no font specified, load the Roboto Flex font as a fallback
-    if font is None:
-        path_font = Path(__file__).parent / '_static/Roboto-Flex.ttf'
-        roboto_font = matplotlib.font_manager.FontEntry(
-            fname=str(path_font), name='Roboto Flex'
+) -> list[Image.Image]:
+    """Render the same page text with each of *renderers*."""
+    layouts = layout_cards(renderers, page_title, description)
+    return [
+        renderer.draw(site_title, title, desc, siteurl)
+        for renderer, (title, desc) in zip(renderers, layouts)
+    ]
+
+
+# The module and class of each renderer, and the package it requires
+RENDERERS = {
+    'matplotlib': (
+        'sphinxext.opengraph._social_cards_matplotlib',
+        'MatplotlibRenderer',
+        'matplotlib',
+    ),
+    'pillow': (
+        'sphinxext.opengraph._social_cards_pillow',
+        'PillowRenderer',
+        'Pillow',
+    ),
+}
+
+# The packages that draw and encode the cards of each renderer
+RENDERER_PACKAGES = {
+    'matplotlib': ('matplotlib', 'PIL'),
+    'pillow': ('PIL',),
+}
+
+_missing_renderers: set[str] = set()
+
+
+def get_renderer(
+    name: str, *, required: bool = True
+) -> type[SocialCardRenderer] | None:
+    """Get the renderer class called *name*.
+
+    Returns None, and warns once, if the renderer's dependencies are not installed.
+    Unless the cards are *required*, such as when the user didn't configure them,
+    this is only logged as information, so that ``-W`` builds don't fail.
+    """
+    try:
+        module_name, class_name, requirement = RENDERERS[name]
+    except KeyError:
+        msg = (
+            f'Unknown social card renderer {name!r}, '
+            f'expected one of: {", ".join(RENDERERS)}'
         )
-        matplotlib.font_manager.fontManager.addfont(path_font)
-        font = roboto_font.name
-
-    # Because Matplotlib doesn't let you specify figures in pixels, only inches
-    # This `multiple` results in a scale of about 1146px by 600px
-    # Which is roughly the recommended size for OpenGraph images
-    # ref: https://opengraph.xyz
-    ratio = 1200 / 628
-    multiple = 6
-    fig = plt.figure(figsize=(ratio * multiple, multiple))
-    fig.set_facecolor(background_color)
-
-    # Text axis
-    axtext = fig.add_axes((0, 0, 1, 1))
-
-    # Image axis
-    ax_x, ax_y, ax_w, ax_h = (0.65, 0.65, 0.3, 0.3)
-    axim_logo = fig.add_axes((ax_x, ax_y, ax_w, ax_h), anchor='NE')
-
-    # Image mini axis
-    ax_x, ax_y, ax_w, ax_h = (0.82, 0.1, 0.1, 0.1)
-    axim_mini = fig.add_axes((ax_x, ax_y, ax_w, ax_h), anchor='NE')
-
-    # Line at the bottom axis
-    axline = fig.add_axes((-0.1, -0.04, 1.2, 0.1))
-
-    # Axes configuration
-    left_margin = 0.05
-    with plt.rc_context({'font.family': font}):
-        # Site title
-        # Smaller font, just above page title
-        site_title_y_offset = 0.87
-        txt_site = axtext.text(
-            left_margin,
-            site_title_y_offset,
-            'Test site title',
-            {'size': 24},
-            ha='left',
-            va='top',
-            wrap=True,
-            c=site_title_color,
+        raise ValueError(msg) from None
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as exc:
+        if name not in _missing_renderers:
+            _missing_renderers.add(name)
+            log = LOGGER.warning if required else LOGGER.info
+            # Name the module that is missing, the renderer may need several
+            log(
+                '[Social card] %s is not installed, social cards will not be generated',
+                exc.name or requirement,
+            )
+        return None
+    return getattr(module, class_name)
+
+
+class SocialCardPool:
+    """Render social cards on a pool of worker processes.
+
+    Each worker keeps its own renderer, so that only the first card
+    rendered by a worker pays the cost of setting it up.
+    Jobs are queued while Sphinx writes pages and waited on by :meth:`finish`.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        # The pool can only be used from the process that created it,
+        # not from the writer processes Sphinx forks for parallel builds.
+        self._pid = os.getpid()
+        self._executor: ProcessPoolExecutor | None = None
+        # The future, page and arguments of each job
+        self._jobs: dict[tuple[Path, ...], tuple[Future[float], str | None, tuple]] = {}
+
+    def submit(
+        self,
+        renderer_name: str,
+        kwargs_fig: dict[str, str | Path | None],
+        variants: list[CardVariant],
+        cache_size: int,
+        paths: list[Path],
+        encoding: tuple[str, int | None],
+        site_title: str,
+        page_title: str,
+        description: str,
+        siteurl: str,
+        *,
+        timeout: float | None = None,
+        docname: str | None = None,
+    ) -> bool:
+        """Queue the cards of a page, returning False if they must be done inline."""
+        if os.getpid() != self._pid:
+            return False
+        key = tuple(paths)
+        if key in self._jobs:
+            return True
+        if self._executor is None:
+            # Imported here as it pulls in multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_pool_worker,
+                initargs=(renderer_name, kwargs_fig, variants, _card_cache),
+            )
+        job = (
+            renderer_name,
+            kwargs_fig,
+            variants,
+            cache_size,
+            paths,
+            encoding,
+            site_title,
+            page_title,
+            description,
+            siteurl,
         )
+        future = self._executor.submit(_render_pool_job, *job, timeout)
+        future.add_done_callback(_count_render_time)
+        self._jobs[key] = future, docname, job
+        return True
+
+    def finish(self, *, cancel: bool = False) -> None:
+        """Wait for all queued cards and shut down the workers.
 
-        # Page title
-        # A larger font for more visibility
-        page_title_y_offset = 0.77
-
-        txt_page = axtext.text(
-            left_margin,
-            page_title_y_offset,
-            'Test page title, a bit longer to demo',
-            {'size': 46, 'color': 'k', 'fontweight': 'bold'},
-            ha='left',
-            va='top',
-            wrap=True,
-            c=page_title_color,
+        The page already links to a card that failed to render,
+        so the default card is written in its place,
+        and recorded by :func:`save_fallback_cards` to be replaced later.
+        """
+        if self._executor is None:
+            return
+        failed = []
+        if not cancel:
+            for paths, (future, docname, job) in self._jobs.items():
+                try:
+                    future.result()
+                except Exception as exc:  # NoQA: BLE001, PERF203
+                    LOGGER.warning(
+                        '[Social card] using the default card for %s: %s',
+                        docname or paths[0].name,
+                        exc,
+                        location=docname,
+                    )
+                    failed.append(job)
+        self._executor.shutdown(wait=True, cancel_futures=cancel)
+        if cancel:
+            # Jobs that never ran leave their locks behind
+            for paths in self._jobs:
+                release_card_lock(card_lock_path(paths[0]))
+        self._executor = None
+        self._jobs.clear()
+        for job in failed:
+            _render_default_card(*job)
+            # Remember the default card, so the next build renders the page again
+            for path in job[4]:
+                _fallback_cards[path] = path.stat().st_mtime_ns
+
+
+class SocialCardWriter:
+    """Encode and write rendered cards to disk on a background thread.
+
+    Cards wait in a bounded queue, so rendering blocks when the thread falls
+    behind instead of holding an unbounded number of images in memory.
+    """
+
+    def __init__(self, maxsize: int = WRITE_QUEUE_SIZE) -> None:
+        self._queue: queue.Queue[
+            tuple[Image.Image, Path, tuple[str, int | None], Path | None] | None
+        ] = queue.Queue(maxsize)
+        self._errors: list[tuple[Path, Exception]] = []
+        self._thread = threading.Thread(
+            target=self._run, name='ogp-social-card-writer', daemon=True
         )
+        self._thread.start()
 
-        txt_page._get_wrap_line_width = _set_page_title_line_width  # NoQA: SLF001
+    def put(
+        self,
+        image: Image.Image,
+        path: Path,
+        encoding: tuple[str, int | None] = ('png', None),
+        lock: Path | None = None,
+    ) -> None:
+        """Queue a card to be written, waiting if the queue is full.
 
-        # description
-        # Just below site title, smallest font and many lines.
-        # Our target length is 160 characters, so it should be
-        # two lines at full width with some room to spare at this length.
-        description_y_offset = 0.2
-        txt_description = axtext.text(
-            left_margin,
-            description_y_offset,
-            (
-                'A longer description that we use to ,'
-                'show off what the descriptions look like.'
-            ),
-            {'size': 17},
-            ha='left',
-            va='bottom',
-            wrap=True,
-            c=description_color,
+        *lock* is released once the card is written.
+        """
+        self._queue.put((image, path, encoding, lock))
+
+    def _run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            image, path, encoding, lock = item
+            try:
+                save_social_card(image, path, encoding)
+            except Exception as exc:  # NoQA: BLE001
+                self._errors.append((path, exc))
+            finally:
+                if lock is not None:
+                    release_card_lock(lock)
+
+    def close(self) -> None:
+        """Write all queued cards and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+        for path, exc in self._errors:
+            LOGGER.warning('[Social card] failed to write %s: %s', path.name, exc)
+
+
+# The writer thread of the main build process, started by the first card
+_card_writer: SocialCardWriter | None = None
+
+# The paths of the cards in each card directory, relative to it and including
+# those queued to be written, so that checking for a card never touches the
+# file system
+_card_indexes: dict[Path, set[str]] = {}
+# Directories of cards created by this process
+_card_dirs: set[Path] = set()
+
+
+# Default cards written by the render pool at the paths of page cards,
+# with their modification time
+_fallback_cards: dict[Path, int] = {}
+
+
+def load_card_index(
+    outdir: str | Path, *, doctreedir: str | Path | None = None
+) -> set[str]:
+    """Scan the cards already in *outdir*, creating their directory if needed.
+
+    Default cards written in place of page cards by an earlier build,
+    as recorded in *doctreedir*, are left out, so that they are rendered again.
+    """
+    path = Path(outdir) / CARD_DIRECTORY
+    path.mkdir(parents=True, exist_ok=True)
+    _card_dirs.add(path)
+    card_index = _card_indexes[path] = _scan_cards(path)
+    if doctreedir is not None:
+        records = _read_fallback_cards(doctreedir)
+        card_index.difference_update(_current_fallback_cards(records, path))
+    return card_index
+
+
+def save_fallback_cards(outdir: str | Path, *, doctreedir: str | Path) -> None:
+    """Record the default cards written in place of page cards in *doctreedir*.
+
+    Cards recorded by earlier builds are kept until they are replaced or deleted.
+    """
+    path_cards = Path(outdir) / CARD_DIRECTORY
+    records = _read_fallback_cards(doctreedir)
+    cards = _current_fallback_cards(records, path_cards)
+    for path_card, mtime in _fallback_cards.items():
+        cards[path_card.relative_to(path_cards).as_posix()] = mtime
+    _fallback_cards.clear()
+    if cards:
+        records[str(path_cards)] = cards
+    elif records.pop(str(path_cards), None) is None:
+        return
+    path = Path(doctreedir) / 'ogp_social_cards' / 'fallbacks.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(records), encoding='utf-8')
+
+
+def _read_fallback_cards(doctreedir: str | Path) -> dict[str, dict[str, int]]:
+    # The recorded default cards of each card directory
+    path = Path(doctreedir) / 'ogp_social_cards' / 'fallbacks.json'
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _current_fallback_cards(
+    records: dict[str, dict[str, int]], path_cards: Path
+) -> dict[str, int]:
+    # The recorded default cards that are still in place, unchanged
+    cards = {}
+    for name, mtime in records.get(str(path_cards), {}).items():
+        try:
+            if (path_cards / name).stat().st_mtime_ns == mtime:
+                cards[name] = mtime
+        except FileNotFoundError:  # NoQA: PERF203
+            pass
+    return cards
+
+
+def clear_card_index() -> None:
+    """Forget the scanned cards, so that the next build scans them again.
+
+    Cards may be deleted between two builds of the same application,
+    such as the rebuilds of a live preview server.
+    """
+    _card_indexes.clear()
+    _card_dirs.clear()
+
+
+def _scan_cards(path: Path, prefix: str = '') -> set[str]:
+    names = set()
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # The file type comes with the directory listing, without a stat
+            if entry.is_dir(follow_symlinks=False):
+                names |= _scan_cards(Path(entry.path), f'{prefix}{entry.name}/')
+            else:
+                names.add(prefix + entry.name)
+    return names
+
+
+# The cards linked by each page written by this process during the build
+_page_cards: dict[str, list[str]] = {}
+# Where processes forked by Sphinx leave the pages they wrote when they exit
+_references_dir: Path | None = None
+# Cards left to be rendered from the manifest, by the path of their first image
+_manifest_jobs: dict[str, dict[str, object]] = {}
+
+
+def reference_cards(docname: str, names: list[str], *, doctreedir: str | Path) -> None:
+    """Record that the page *docname* was written and links the cards *names*.
+
+    Cards are named by their path relative to :data:`CARD_DIRECTORY`.
+    """
+    global _references_dir  # NoQA: PLW0603
+    _page_cards[docname] = names
+    if _references_dir is None and multiprocessing.parent_process() is not None:
+        # The pages written by a parallel writer are reported back to the
+        # main process through a file, written when the writer exits
+        _references_dir = Path(doctreedir) / 'ogp_social_cards'
+        multiprocessing.util.Finalize(None, _flush_references, exitpriority=10)
+
+
+def _flush_references() -> None:
+    path = _references_dir / f'references-{os.getpid()}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cache = [_card_cache.hits, _card_cache.misses] if _card_cache else [0, 0]
+    flushed = {'pages': _page_cards, 'cache': cache, 'jobs': _manifest_jobs}
+    path.write_text(json.dumps(flushed), encoding='utf-8')
+
+
+def collect_card_records(doctreedir: str | Path) -> None:
+    """Gather what the processes forked by Sphinx recorded about their pages.
+
+    Adds the pages they wrote, their use of the card cache
+    and the render jobs they left for the manifest to those of this process.
+    """
+    for path in (Path(doctreedir) / 'ogp_social_cards').glob('references-*.json'):
+        flushed = json.loads(path.read_text(encoding='utf-8'))
+        _page_cards.update(flushed['pages'])
+        if _card_cache is not None:
+            _card_cache.hits += flushed['cache'][0]
+            _card_cache.misses += flushed['cache'][1]
+        _manifest_jobs.update(flushed['jobs'])
+        path.unlink()
+
+
+def cleanup_cards(
+    config_social: dict[str, bool | str],
+    *,
+    outdir: str | Path,
+    doctreedir: str | Path,
+    all_docs: set[str],
+) -> None:
+    """Delete the cards in *outdir* that no page links to any more.
+
+    The cards linked by each page are kept between builds, so that the pages
+    an incremental build does not write keep their cards.
+    Without that record, cards are only deleted if every page was written.
+    If ``cleanup`` is ``"report"``, stale cards are listed but kept.
+    Draft builds delete no cards, so that the next full build finds its cards.
+    """
+    mode = config_social.get('cleanup', True)
+    draft = draft_mode(config_social)
+    path_references = Path(doctreedir) / 'ogp_social_cards' / 'references.json'
+    try:
+        references = json.loads(path_references.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        references = None
+
+    # Pages written by this build, including those written by parallel writers
+    collect_card_records(doctreedir)
+    written = dict(_page_cards)
+    _page_cards.clear()
+    if draft and references is not None:
+        # Pages keep the cards of the last full build next to their draft cards
+        for docname, names in written.items():
+            earlier = references.get(docname, [])
+            written[docname] = list(dict.fromkeys([*earlier, *names]))
+
+    known = {**(references or {}), **written}
+    known = {docname: names for docname, names in known.items() if docname in all_docs}
+    path_references.parent.mkdir(parents=True, exist_ok=True)
+    path_references.write_text(json.dumps(known), encoding='utf-8')
+
+    if not mode:
+        return
+    path_cards = Path(outdir) / CARD_DIRECTORY
+    try:
+        names = _scan_cards(path_cards)
+    except FileNotFoundError:
+        return
+    if mode != 'report':
+        _remove_unfinished_cards(path_cards, names)
+    if draft:
+        return
+    if references is None and not all_docs <= written.keys():
+        LOGGER.info(
+            '[Social card] not all pages were written, keeping unused social cards'
+        )
+        return
+
+    linked = {name for names in known.values() for name in names}
+    stale = sorted(
+        name
+        for name in names
+        if name.rpartition('/')[2].startswith('summary_') and name not in linked
+    )
+    if not stale:
+        return
+    if mode == 'report':
+        LOGGER.info(
+            '[Social card] %d social cards are no longer used: %s',
+            len(stale),
+            ', '.join(stale),
+        )
+        return
+    card_index = _card_indexes.get(path_cards, set())
+    for name in stale:
+        (path_cards / name).unlink(missing_ok=True)
+        card_index.discard(name)
+    LOGGER.info('[Social card] removed %d unused social cards', len(stale))
+
+
+def _remove_unfinished_cards(path_cards: Path, names: set[str]) -> None:
+    # Lock and temporary files of cards left behind by builds that were killed.
+    # Newer ones may belong to a build that is still running.
+    for name in names:
+        basename = name.rpartition('/')[2]
+        if not (basename.startswith('.') and basename.endswith(('.lock', '.tmp'))):
+            continue
+        path = path_cards / name
+        with contextlib.suppress(FileNotFoundError):
+            if time.time() - path.stat().st_mtime >= CARD_LOCK_TIMEOUT:
+                path.unlink()
+
+
+def write_card_manifest(
+    config_social: dict[str, bool | str], *, srcdir: str | Path, outdir: str | Path
+) -> None:
+    """Write the cards this build left to be rendered to the ``manifest`` file.
+
+    The path of the manifest is relative to the source directory.
+    Its cards are rendered by ``python -m sphinxext.opengraph``.
+    The source and output directories are stored relative to the manifest,
+    so that it can be used from another checkout of the project.
+    """
+    if not (manifest := config_social.get('manifest')):
+        return
+    path = Path(srcdir) / manifest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    jobs = [_manifest_jobs[key] for key in sorted(_manifest_jobs)]
+    _manifest_jobs.clear()
+    data = {
+        'version': MANIFEST_VERSION,
+        'srcdir': _relative_path(srcdir, path.parent),
+        'outdir': _relative_path(outdir, path.parent),
+        'jobs': jobs,
+    }
+    path.write_text(json.dumps(data, indent=1), encoding='utf-8')
+    LOGGER.info('[Social card] wrote %d cards to render to %s', len(jobs), path)
+
+
+def _relative_path(path: str | Path, start: Path) -> str:
+    # The path relative to start, or absolute if on another drive
+    try:
+        return Path(os.path.relpath(path, start)).as_posix()
+    except ValueError:
+        return str(Path(path).resolve())
+
+
+def render_manifest_job(
+    job: dict[str, object], outdir: str | Path, *, srcdir: str | Path
+) -> bool:
+    """Render the cards of a job from a manifest into *outdir*.
+
+    The images and font of the card are looked up in *srcdir*.
+    Returns False if the cards already exist, and so were not rendered.
+    """
+    paths = [Path(outdir) / path for path in job['paths']]
+    if all(path.exists() for path in paths):
+        return False
+    kwargs_fig = social_card_figure_kwargs(
+        job['style'], srcdir=srcdir, html_logo=job['html_logo']
+    )
+    variants = [CardVariant(*variant) for variant in job['variants']]
+    renderers = get_card_renderers(job['renderer'], kwargs_fig, variants)
+    images = render_cards(
+        renderers,
+        job['site_name'],
+        job['page_title'],
+        job['description'],
+        job['url_text'],
+    )
+    for image, path in zip(images, paths):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        save_social_card(image, path, tuple(job['encoding']))
+    return True
+
+
+def save_social_card(
+    image: Image.Image,
+    path: Path,
+    encoding: tuple[str, int | None] = ('png', None),
+    *,
+    cache: bool = True,
+) -> None:
+    """Encode a card in the given format and quality and write it to *path*.
+
+    A card is a flat background with a few colours of text and two small images,
+    so it compresses well even when reduced to a palette of 256 colours.
+    The card is written to a temporary file that is then renamed to *path*,
+    so that a killed or concurrent build never leaves a partial card behind.
+    Unless *cache* is False, the card is then added to the cache shared
+    between builds, if there is one.
+    """
+    card_format, quality = encoding
+    if quality is None:
+        quality = DEFAULT_QUALITY
+    path_tmp = path.with_name(f'.{path.name}.{os.getpid()}-{threading.get_ident()}.tmp')
+    try:
+        if card_format == 'png-quantized':
+            from PIL.Image import Quantize
+
+            # Fast octree is the only quantizer that keeps the alpha channel
+            palette = image.quantize(256, method=Quantize.FASTOCTREE)
+            palette.save(path_tmp, format='PNG', optimize=True)
+        elif card_format == 'webp':
+            image.save(path_tmp, format='WEBP', quality=quality, method=4)
+        elif card_format == 'jpeg':
+            image.convert('RGB').save(
+                path_tmp, format='JPEG', quality=quality, optimize=True
+            )
+        else:
+            image.save(path_tmp, format='PNG')
+        path_tmp.replace(path)
+    finally:
+        path_tmp.unlink(missing_ok=True)
+    if cache and _card_cache is not None:
+        _card_cache.store(path)
+
+
+def write_social_card(
+    image: Image.Image,
+    path: Path,
+    encoding: tuple[str, int | None] = ('png', None),
+    *,
+    lock: Path | None = None,
+) -> None:
+    """Write a card to *path*, in the background in the main build process.
+
+    Processes forked by Sphinx for parallel writing, or pool workers,
+    have no chance to wait for a writer thread, so they write directly.
+    *lock* is released once the card is written.
+    """
+    global _card_writer  # NoQA: PLW0603
+    if multiprocessing.parent_process() is not None:
+        try:
+            save_social_card(image, path, encoding)
+        finally:
+            if lock is not None:
+                release_card_lock(lock)
+        return
+    if _card_writer is None:
+        _card_writer = SocialCardWriter()
+    _card_writer.put(image, path, encoding, lock)
+
+
+def finish_card_writer() -> None:
+    """Wait for all queued cards to be written to disk."""
+    global _card_writer  # NoQA: PLW0603
+    if _card_writer is not None:
+        _card_writer.close()
+        _card_writer = None
+
+
+def card_lock_path(path: Path) -> Path:
+    """Get the lock file held while the card at *path* is being made."""
+    return path.with_name(f'.{path.name}.lock')
+
+
+def acquire_card_lock(lock: Path) -> bool:
+    """Take the lock of a card, unless another process holds it.
+
+    Locks older than :data:`CARD_LOCK_TIMEOUT` are assumed to be left
+    by a build that was killed, and are taken over.
+    """
+    for _ in range(2):
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:  # NoQA: PERF203
+            try:
+                age = time.time() - lock.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < CARD_LOCK_TIMEOUT:
+                return False
+            release_card_lock(lock)
+        else:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            return True
+    return False
+
+
+def release_card_lock(lock: Path) -> None:
+    """Release the lock of a card."""
+    lock.unlink(missing_ok=True)
+
+
+# Cards that were being rendered by another build when this build needed them
+_awaited_cards: list[tuple] = []
+
+
+def _await_card(job: tuple) -> None:
+    # Wait for the other build to release the lock, or for the lock to go stale.
+    # If the other build didn't write the card, render it here instead.
+    paths = job[4]
+    lock = card_lock_path(paths[0])
+    deadline = time.monotonic() + CARD_LOCK_TIMEOUT
+    while lock.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if all(path.exists() for path in paths):
+        return
+    if acquire_card_lock(lock):
+        _render_pool_job(*job)
+    else:
+        LOGGER.warning(
+            '[Social card] timed out waiting for %s to be rendered', paths[0].name
         )
-        txt_description._get_wrap_line_width = _set_description_line_width  # NoQA: SLF001
-
-        # url
-        # Aligned to the left of the mini image
-        url_y_axis_ofset = 0.12
-        txt_url = axtext.text(
-            left_margin,
-            url_y_axis_ofset,
-            'testurl.org',
-            {'size': 22},
-            ha='left',
-            va='bottom',
-            fontweight='bold',
-            c=site_url_color,
+
+
+def finish_awaited_cards() -> None:
+    """Wait for the cards that other builds were rendering to be written."""
+    while _awaited_cards:
+        _await_card(_awaited_cards.pop(0))
+
+
+# Seconds spent rendering cards by the build, in memory shared with the
+# writer processes Sphinx forks, so that they use up one render budget
+_render_time: Synchronized | None = None
+
+
+def start_render_time() -> None:
+    """Count the time spent rendering the cards of a build from zero.
+
+    Called in the main process before Sphinx forks its parallel writers,
+    so that the time they spend is added to the same count.
+    """
+    global _render_time  # NoQA: PLW0603
+    if _render_time is None:
+        _render_time = multiprocessing.Value('d', 0.0)
+    else:
+        _render_time.value = 0.0
+
+
+def add_render_time(seconds: float) -> None:
+    """Add to the time spent rendering the cards of the build."""
+    if _render_time is None:
+        start_render_time()
+    with _render_time.get_lock():
+        _render_time.value += seconds
+
+
+def spent_render_time() -> float:
+    """Get the time spent rendering the cards of the build, in seconds."""
+    return 0.0 if _render_time is None else _render_time.value
+
+
+# The cache of cards shared between builds, if one is configured
+_card_cache: CardCache | None = None
+
+
+def open_card_cache(
+    config_social: dict[str, bool | str], *, srcdir: str | Path
+) -> None:
+    """Share cards with other builds through the configured ``cache_dir``.
+
+    Cards are kept in its ``cards`` subdirectory, which is trimmed to
+    ``cache_max_size`` megabytes by :func:`finish_card_cache`.
+    """
+    global _card_cache  # NoQA: PLW0603
+    _card_cache = None
+    if cache_dir := config_social.get('cache_dir'):
+        from sphinxext.opengraph._card_cache import CardCache
+
+        max_size = config_social.get('cache_max_size') or CARD_CACHE_SIZE
+        _card_cache = CardCache(
+            Path(srcdir) / cache_dir / 'cards', int(max_size * 1024 * 1024)
         )
 
-    if isinstance(image_mini, Path):
-        img = mpimg.imread(image_mini)
-        axim_mini.imshow(img)
 
-    # Put the logo in the top right if it exists
-    if isinstance(image, Path):
-        img = mpimg.imread(image)
-        yw, xw = img.shape[:2]
+def finish_card_cache() -> None:
+    """Report the use of the card cache and evict the least recently used cards."""
+    if _card_cache is None:
+        return
+    LOGGER.info(
+        '[Social card] card cache: %d hits, %d misses',
+        _card_cache.hits,
+        _card_cache.misses,
+    )
+    _card_cache.hits = _card_cache.misses = 0
+    if removed := _card_cache.trim():
+        LOGGER.info('[Social card] evicted %d cards from the card cache', removed)
+
+
+# The pool used by the current build, if cards are rendered in the background
+_render_pool: SocialCardPool | None = None
 
-        # Axis is square and width is longest image axis
-        longest = max([yw, xw])
-        axim_logo.set_xlim([0, longest])
-        axim_logo.set_ylim([longest, 0])
+# Renderers of this process, keyed by name, figure keyword arguments
+# and the size and scale of the card, from least to most recently used.
+# They are deliberately not stored in the build environment,
+# so that Sphinx never tries to pickle them.
+_renderers: OrderedDict[
+    tuple[str, tuple[tuple[str, str | Path | None], ...], tuple[int, int, float]],
+    SocialCardRenderer,
+] = OrderedDict()
 
-        # Center it on the non-long axis
-        xdiff = (longest - xw) / 2
-        ydiff = (longest - yw) / 2
-        axim_logo.imshow(img, extent=[xdiff, xw + xdiff, yw + ydiff, ydiff])
 
-    # Put a colored line at the bottom of the figure
-    axline.hlines(0, 0, 1, lw=25, color=line_color)
+def start_render_pool(workers: int) -> None:
+    """Start rendering social cards on *workers* processes, if more than one."""
+    global _render_pool  # NoQA: PLW0603
+    if _render_pool is not None:
+        _render_pool.finish(cancel=True)
+    _render_pool = SocialCardPool(workers) if workers > 1 else None
 
-    # Remove the ticks and borders from all axes for a clean look
-    for ax in fig.axes:
-        ax.set_axis_off()
-    return fig, txt_site, txt_page, txt_description, txt_url
 
+def finish_render_pool(*, cancel: bool = False) -> None:
+    """Wait for queued social cards to be written and stop the pool."""
+    global _render_pool  # NoQA: PLW0603
+    if _render_pool is not None:
+        _render_pool.finish(cancel=cancel)
+        _render_pool = None
+    # The next build of the application starts its budget afresh
+    if _render_time is not None:
+        _render_time.value = 0.0
 
-# These functions are used when creating social card objects to set MPL values.
-# They must be defined here otherwise Sphinx errors when trying to pickle them.
-# They are dependent on the `multiple` variable defined when the figure is created.
-# Because they are depending on the figure size and renderer used to generate them.
-def _set_page_title_line_width() -> int:
-    return 825
 
+def get_social_card_renderer(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variant: CardVariant | None = None,
+    *,
+    cache_size: int = TEMPLATE_CACHE_SIZE,
+) -> SocialCardRenderer:
+    """Get the renderer for these figure arguments, creating it on first use.
 
-def _set_description_line_width() -> int:
-    return 1000
+    At most *cache_size* renderers are kept, the least recently used
+    are closed to make room for new ones.
+    """
+    key = _renderer_key(renderer_name, kwargs_fig, variant)
+    try:
+        _renderers.move_to_end(key)
+        return _renderers[key]
+    except KeyError:
+        while len(_renderers) >= max(cache_size, 1):
+            _, evicted = _renderers.popitem(last=False)
+            evicted.close()
+        renderer_cls = get_renderer(renderer_name)
+        width, height, scale = key[2]
+        renderer = _renderers[key] = renderer_cls(
+            width=width, height=height, scale=scale, **kwargs_fig
+        )
+        return renderer
+
+
+def _renderer_key(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variant: CardVariant | None = None,
+) -> tuple:
+    if variant is None:
+        variant = CardVariant('opengraph', *CARD_VARIANTS['opengraph'])
+    _, width, height, scale = variant
+    return renderer_name, tuple(sorted(kwargs_fig.items())), (width, height, scale)
+
+
+def discard_renderers(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variants: list[CardVariant],
+) -> None:
+    """Close the renderers of a card that failed to render.
+
+    Rendering may have been interrupted half way, such as by a timeout,
+    leaving a renderer in a state that would spoil later cards,
+    so the next card creates them afresh.
+    """
+    for variant in variants:
+        renderer = _renderers.pop(
+            _renderer_key(renderer_name, kwargs_fig, variant), None
+        )
+        if renderer is not None:
+            renderer.close()
+
+
+def get_card_renderers(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variants: list[CardVariant],
+    cache_size: int = TEMPLATE_CACHE_SIZE,
+) -> list[SocialCardRenderer]:
+    """Get the renderers for each variant of a card.
+
+    The cache is made large enough to hold all of them,
+    so that none is closed while the others are fetched.
+    """
+    cache_size = max(cache_size, len(variants))
+    return [
+        get_social_card_renderer(
+            renderer_name, kwargs_fig, variant, cache_size=cache_size
+        )
+        for variant in variants
+    ]
+
+
+def close_renderers() -> None:
+    """Close the renderers of this process, releasing their memory."""
+    # The images and fonts may change before the next build
+    _card_styles.clear()
+    _style_fingerprints.clear()
+    while _renderers:
+        _, renderer = _renderers.popitem()
+        renderer.close()
+
+
+def prewarm_renderer(
+    config_social: dict[str, bool | str],
+    *,
+    srcdir: str | Path,
+    doctreedir: str | Path | None = None,
+    html_logo: str | None = None,
+    required: bool = True,
+) -> None:
+    """Create and warm up the renderers for the build ahead of time.
+
+    Called in the main process before Sphinx forks its parallel writers,
+    so that each of them inherits the renderer instead of building its own.
+    """
+    renderer_name = config_social.get('renderer', 'matplotlib')
+    if draft_mode(config_social) == 'skip':
+        return
+    if get_renderer(renderer_name, required=required) is None:
+        return
+    # Problems with the images are reported by the first card that is made
+    kwargs_fig, _, _ = card_style(
+        renderer_name,
+        config_social,
+        srcdir=srcdir,
+        doctreedir=doctreedir,
+        html_logo=html_logo,
+    )
+    for variant in card_variants(config_social):
+        get_social_card_renderer(renderer_name, kwargs_fig, variant).warm_up()
+
+
+def _init_pool_worker(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variants: list[CardVariant],
+    card_cache: CardCache | None,
+) -> None:
+    global _card_cache  # NoQA: PLW0603
+    # Workers that are not forked don't inherit the cache of the build
+    _card_cache = card_cache
+    # Build the renderers up front so the worker is warm for its first job
+    get_card_renderers(renderer_name, kwargs_fig, variants)
+
+
+def _render_pool_job(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variants: list[CardVariant],
+    cache_size: int,
+    paths: list[Path],
+    encoding: tuple[str, int | None],
+    site_title: str,
+    page_title: str,
+    description: str,
+    siteurl: str,
+    timeout: float | None = None,
+) -> float:
+    # Returns the time taken to render the cards
+    start = time.perf_counter()
+    try:
+        try:
+            with time_limit(timeout):
+                renderers = get_card_renderers(
+                    renderer_name, kwargs_fig, variants, cache_size
+                )
+                images = render_cards(
+                    renderers, site_title, page_title, description, siteurl
+                )
+        except Exception:
+            discard_renderers(renderer_name, kwargs_fig, variants)
+            raise
+        for image, path in zip(images, paths):
+            save_social_card(image, path, encoding)
+    finally:
+        release_card_lock(card_lock_path(paths[0]))
+    return time.perf_counter() - start
+
+
+def _count_render_time(future: Future[float]) -> None:
+    if not future.cancelled() and future.exception() is None:
+        add_render_time(future.result())
+
+
+def _render_default_card(
+    renderer_name: str,
+    kwargs_fig: dict[str, str | Path | None],
+    variants: list[CardVariant],
+    cache_size: int,
+    paths: list[Path],
+    encoding: tuple[str, int | None],
+    site_title: str,
+    page_title: str,
+    description: str,
+    siteurl: str,
+) -> None:
+    # Draw the default card, without page text, at the paths of a page's card.
+    # It is kept out of the cache shared between builds, which is for real cards.
+    renderers = get_card_renderers(renderer_name, kwargs_fig, variants, cache_size)
+    images = render_cards(renderers, site_title, '', '', siteurl)
+    for image, path in zip(images, paths):
+        save_social_card(image, path, encoding, cache=False)
@@ -0,0 +1,260 @@
+"""Render social cards with Matplotlib."""
+
+from __future__ import annotations
+
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import matplotlib as mpl
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.font_manager import FontProperties, findfont
+from PIL import Image
+
+from sphinxext.opengraph._image_cache import load_fitted_image
+from sphinxext.opengraph._social_cards import SocialCardRenderer
+from sphinxext.opengraph._text_layout import get_text_layout
+
+if TYPE_CHECKING:
+    from typing import TypeAlias
+
+    from matplotlib.backends.backend_agg import BufferRegion
+    from matplotlib.figure import Figure
+    from matplotlib.text import Text
+
+    PltObjects: TypeAlias = tuple[Figure, Text, Text, Text, Text]
+
+mpl.use('agg')
+
+HERE = Path(__file__).parent
+
+# Rasterized figure without the per-page text, keyed by the figure it was drawn
+# from. The key is the site title and URL text drawn into the background.
+_backgrounds: weakref.WeakKeyDictionary[
+    Figure, tuple[tuple[str, str], BufferRegion]
+] = weakref.WeakKeyDictionary()
+
+
+class MatplotlibRenderer(SocialCardRenderer):
+    """Render cards by updating the text of a reused Matplotlib figure."""
+
+    name = 'matplotlib'
+
+    def __init__(
+        self,
+        *,
+        width: int | None = None,
+        height: int | None = None,
+        scale: float = 1,
+        **kwargs_fig: str | Path | None,
+    ) -> None:
+        super().__init__(width=width, height=height, scale=scale)
+        self.plt_objects = create_social_card_objects(
+            **kwargs_fig, size=(self.width, self.height), scale=self.scale
+        )
+        font = kwargs_fig.get('font') or HERE / '_static/Roboto-Flex.ttf'
+        if not Path(font).is_file():
+            font = findfont(font)
+        self.text_layout = get_text_layout(str(font))
+
+    def draw(
+        self,
+        site_title: str,
+        page_title: str,
+        description: str,
+        siteurl: str,
+    ) -> Image.Image:
+        return render_social_card(
+            site_title, page_title, description, siteurl, self.plt_objects
+        )
+
+    def warm_up(self) -> None:
+        # Drawing once loads the fonts and resamples the images
+        self.plt_objects[0].canvas.draw()
+
+    def close(self) -> None:
+        plt.close(self.plt_objects[0])
+
+
+def render_social_card(
+    site_title: str,
+    page_title: str,
+    description: str,
+    siteurl: str,
+    plt_objects: PltObjects,
+) -> Image.Image:
+    """Render a social preview card with Matplotlib into an image.
+
+    Everything except the page title and description is the same for each page,
+    so it is rasterized once and only the page text is drawn on top of it.
+    """
+    fig, txt_site_title, txt_page_title, txt_description, txt_url = plt_objects
+    canvas = fig.canvas
+    page_texts = (txt_page_title, txt_description)
+
+    background_key = (site_title, siteurl)
+    cached = _backgrounds.get(fig)
+    if cached is not None and cached[0] == background_key:
+        canvas.restore_region(cached[1])
+    else:
+        # Draw the logos, line, site title and URL without the page text
+        txt_site_title.set_text(site_title)
+        txt_url.set_text(siteurl)
+        for txt in page_texts:
+            txt.set_visible(False)
+        canvas.draw()
+        _backgrounds[fig] = background_key, canvas.copy_from_bbox(fig.bbox)
+        for txt in page_texts:
+            txt.set_visible(True)
+
+    # Update the matplotlib text objects with new text from this page
+    txt_page_title.set_text(page_title)
+    txt_description.set_text(description)
+    for txt in page_texts:
+        fig.draw_artist(txt)
+
+    # Copy the pixels out, the canvas buffer is reused for the next card
+    return Image.fromarray(np.array(canvas.buffer_rgba()))
+
+
+def create_social_card_objects(
+    image: Path | None = None,
+    image_mini: Path | None = None,
+    page_title_color: str = '#2f363d',
+    description_color: str = '#585e63',
+    site_title_color: str = '#585e63',
+    site_url_color: str = '#2f363d',
+    background_color: str = 'white',
+    line_color: str = '#5A626B',
+    font: str | None = None,
+    cache_dir: Path | None = None,
+    size: tuple[int, int] = (1146, 600),
+    scale: float = 1,
+) -> PltObjects:
+    """Create the Matplotlib objects for the first time.
+
+    *font* is either the path of a font file or the name of a font family.
+    *size* is the size of the card in pixels, which is multiplied by *scale*
+    to get the size of the image.
+    Images are scaled once to the pixels they cover, cached in *cache_dir*.
+    """
+    # If no font specified, load the Roboto Flex font as a fallback.
+    # Font files are used directly, so that they don't have to be registered
+    # with (or looked up among the system fonts by) Matplotlib's font manager.
+    if font is None:
+        font = HERE / '_static/Roboto-Flex.ttf'
+    if Path(font).is_file():
+        font_properties = FontProperties(fname=font)
+    else:
+        font_properties = FontProperties(family=font)
+
+    def sized_font(size: float) -> FontProperties:
+        properties = font_properties.copy()
+        properties.set_size(size)
+        return properties
+
+    # Because Matplotlib doesn't let you specify figures in pixels, only inches,
+    # the size is given at 100 DPI, and a higher DPI scales up the whole card.
+    # The default of 1146px by 600px is roughly the recommended size for
+    # OpenGraph images, ref: https://opengraph.xyz
+    width, height = size
+    fig = plt.figure(figsize=(width / 100, height / 100), dpi=100 * scale)
+    fig.set_facecolor(background_color)
+
+    # Text axis
+    axtext = fig.add_axes((0, 0, 1, 1))
+
+    # Line at the bottom axis
+    axline = fig.add_axes((-0.1, -0.04, 1.2, 0.1))
+
+    # Axes configuration
+    left_margin = 0.05
+
+    # Site title
+    # Smaller font, just above page title
+    site_title_y_offset = 0.87
+    txt_site = axtext.text(
+        left_margin,
+        site_title_y_offset,
+        'Test site title',
+        fontproperties=sized_font(24),
+        ha='left',
+        va='top',
+        c=site_title_color,
+    )
+
+    # Page title
+    # A larger font for more visibility
+    page_title_y_offset = 0.77
+
+    txt_page = axtext.text(
+        left_margin,
+        page_title_y_offset,
+        'Test page title, a bit longer to demo',
+        fontproperties=sized_font(46),
+        ha='left',
+        va='top',
+        c=page_title_color,
+    )
+
+    # description
+    # Just below site title, smallest font and many lines.
+    # The text is wrapped by ``SocialCardRenderer.layout`` to at most
+    # two lines at full width.
+    description_y_offset = 0.2
+    txt_description = axtext.text(
+        left_margin,
+        description_y_offset,
+        (
+            'A longer description that we use to ,'
+            'show off what the descriptions look like.'
+        ),
+        fontproperties=sized_font(17),
+        ha='left',
+        va='bottom',
+        c=description_color,
+    )
+
+    # url
+    # Aligned to the left of the mini image
+    url_y_axis_ofset = 0.12
+    txt_url = axtext.text(
+        left_margin,
+        url_y_axis_ofset,
+        'testurl.org',
+        fontproperties=sized_font(22),
+        ha='left',
+        va='bottom',
+        c=site_url_color,
+    )
+
+    # The images are placed pixel for pixel, measured from the bottom left,
+    # so that they are never resampled when the card is drawn
+    width_px, height_px = width * scale, height * scale
+
+    # Mini image to the bottom right, aligned to the top right of its box
+    if isinstance(image_mini, Path):
+        box = round(0.1 * width_px), round(0.1 * height_px)
+        img = load_fitted_image(image_mini, box, cache_dir=cache_dir)
+        right, top = round(0.92 * width_px), round(0.2 * height_px)
+        fig.figimage(np.asarray(img), right - img.width, top - img.height)
+
+    # Put the logo in the top right if it exists, centred in a square box
+    if isinstance(image, Path):
+        side = round(0.3 * min(width_px, height_px))
+        img = load_fitted_image(image, (side, side), cache_dir=cache_dir)
+        right, top = round(0.95 * width_px), round(0.95 * height_px)
+        fig.figimage(
+            np.asarray(img),
+            right - side + (side - img.width) // 2,
+            top - side + (side - img.height) // 2,
+        )
+
+    # Put a colored line at the bottom of the figure
+    axline.hlines(0, 0, 1, lw=25, color=line_color)
+
+    # Remove the ticks and borders from all axes for a clean look
+    for ax in fig.axes:
+        ax.set_axis_off()
+    return fig, txt_site, txt_page, txt_description, txt_url
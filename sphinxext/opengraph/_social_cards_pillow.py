@@ -0,0 +1,208 @@
+"""Render social cards with Pillow."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+from sphinx.errors import ConfigError
+
+from sphinxext.opengraph._image_cache import load_fitted_image
+from sphinxext.opengraph._social_cards import POINTS_TO_PIXELS, SocialCardRenderer
+from sphinxext.opengraph._text_layout import get_text_layout
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont
+
+# The line spacing Matplotlib uses for multi-line text
+LINE_SPACING = 1.2
+LEFT_MARGIN = 0.05
+
+
+class PillowRenderer(SocialCardRenderer):
+    """Render cards by drawing text onto a pre-composed background image.
+
+    The layout follows the Matplotlib renderer, with positions given as
+    fractions of the card and font sizes in points, so that both backends
+    produce the same card.
+    """
+
+    name = 'pillow'
+
+    def __init__(
+        self,
+        image: Path | None = None,
+        image_mini: Path | None = None,
+        page_title_color: str = '#2f363d',
+        description_color: str = '#585e63',
+        site_title_color: str = '#585e63',
+        site_url_color: str = '#2f363d',
+        background_color: str = 'white',
+        line_color: str = '#5A626B',
+        font: str | None = None,
+        cache_dir: Path | None = None,
+        *,
+        width: int | None = None,
+        height: int | None = None,
+        scale: float = 1,
+    ) -> None:
+        super().__init__(width=width, height=height, scale=scale)
+        if font is None:
+            font = str(Path(__file__).parent / '_static/Roboto-Flex.ttf')
+        self.page_title_color = ImageColor.getrgb(page_title_color)
+        self.description_color = ImageColor.getrgb(description_color)
+        self.site_title_color = ImageColor.getrgb(site_title_color)
+        self.site_url_color = ImageColor.getrgb(site_url_color)
+
+        try:
+            self.font_site_title = _load_font(font, 24 * scale)
+        except OSError:
+            # Pillow can't look up installed fonts by their family name
+            msg = (
+                'The Pillow social card renderer needs the path or file name '
+                f'of a TrueType or OpenType font, not {font!r}'
+            )
+            raise ConfigError(msg) from None
+        self.font_page_title = _load_font(font, 46 * scale)
+        self.font_description = _load_font(font, 17 * scale)
+        self.font_url = _load_font(font, 22 * scale)
+        self.text_layout = get_text_layout(self.font_url.path)
+
+        # Everything that doesn't depend on the page text
+        width, height = round(self.width * scale), round(self.height * scale)
+        background = Image.new('RGBA', (width, height), background_color)
+
+        # Put the logo in the top right if it exists, centred in a square box
+        if isinstance(image, Path):
+            size = round(0.3 * min(width, height))
+            right, top = round(0.95 * width), round(0.05 * height)
+            _paste_fit(
+                background,
+                image,
+                (right - size, top, right, top + size),
+                cache_dir=cache_dir,
+            )
+
+        # Mini image to the bottom right, aligned to the top right of its box
+        if isinstance(image_mini, Path):
+            right, top = round(0.92 * width), round(0.8 * height)
+            box = (right - round(0.1 * width), top, right, top + round(0.1 * height))
+            _paste_fit(background, image_mini, box, anchor='NE', cache_dir=cache_dir)
+
+        # Put a colored line at the bottom of the card
+        draw = ImageDraw.Draw(background)
+        draw.rectangle((0, round(0.963 * height), width, height), fill=line_color)
+
+        self.background = background
+        self._site_key: tuple[str, str] | None = None
+        self._site_background = background
+
+    def draw(
+        self,
+        site_title: str,
+        page_title: str,
+        description: str,
+        siteurl: str,
+    ) -> Image.Image:
+        width, height = round(self.width * self.scale), round(self.height * self.scale)
+        x = LEFT_MARGIN * width
+
+        # The site title and URL are the same for each page,
+        # so draw them once onto a copy of the background.
+        if self._site_key != (site_title, siteurl):
+            card = self.background.copy()
+            draw = ImageDraw.Draw(card)
+            _draw_lines(
+                draw,
+                [site_title],
+                self.font_site_title,
+                self.site_title_color,
+                x,
+                top=0.13 * height,
+            )
+            _draw_lines(
+                draw,
+                [siteurl],
+                self.font_url,
+                self.site_url_color,
+                x,
+                bottom=0.88 * height,
+            )
+            self._site_key = site_title, siteurl
+            self._site_background = card
+
+        card = self._site_background.copy()
+        draw = ImageDraw.Draw(card)
+
+        # Page title, a larger font for more visibility
+        _draw_lines(
+            draw,
+            page_title.splitlines(),
+            self.font_page_title,
+            self.page_title_color,
+            x,
+            top=0.23 * height,
+        )
+
+        # Description, growing upwards from just above the site URL
+        _draw_lines(
+            draw,
+            description.splitlines(),
+            self.font_description,
+            self.description_color,
+            x,
+            bottom=0.8 * height,
+        )
+
+        return card
+
+
+def _load_font(font: str, points: float) -> FreeTypeFont:
+    return ImageFont.truetype(font, points * POINTS_TO_PIXELS)
+
+
+def _paste_fit(
+    card: Image.Image,
+    path: Path,
+    box: tuple[int, int, int, int],
+    *,
+    anchor: str = 'C',
+    cache_dir: Path | None = None,
+) -> None:
+    """Scale the image at *path* to fit *box*, keeping its aspect ratio."""
+    left, top, right, bottom = box
+    img = load_fitted_image(path, (right - left, bottom - top), cache_dir=cache_dir)
+    size = img.size
+    if anchor == 'NE':
+        position = right - size[0], top
+    else:
+        position = (
+            left + (right - left - size[0]) // 2,
+            top + (bottom - top - size[1]) // 2,
+        )
+    card.alpha_composite(img, position)
+
+
+def _draw_lines(
+    draw: ImageDraw.ImageDraw,
+    lines: list[str],
+    font: FreeTypeFont,
+    fill: tuple[int, ...],
+    x: float,
+    *,
+    top: float | None = None,
+    bottom: float | None = None,
+) -> None:
+    """Draw *lines* aligned to either a *top* or a *bottom* edge."""
+    # Like Matplotlib, space the lines by the height of "lp" in this font
+    _, ascent, _, descent = font.getbbox('lp', anchor='ls')
+    ascent, descent = -ascent * LINE_SPACING, descent * LINE_SPACING
+    pitch = ascent + descent
+    if top is not None:
+        baseline = top + ascent
+    else:
+        baseline = bottom - descent - pitch * (len(lines) - 1)
+    for line in lines:
+        draw.text((x, baseline), line, font=font, fill=fill, anchor='ls')
+        baseline += pitch
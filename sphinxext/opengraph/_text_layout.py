@@ -0,0 +1,125 @@
+"""Wrap and truncate card text using a table of glyph advances."""
+
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PIL import ImageFont
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import NDArray
+
+# Advances are measured once at this size and scaled linearly to the text size
+REFERENCE_SIZE = 1000
+# Code points measured up front: Basic Latin to Latin Extended-B and punctuation.
+# Anything else is measured the first time it is seen.
+PRELOAD_RANGES = ((0x20, 0x250), (0x2000, 0x2070))
+ELLIPSIS = '...'
+
+
+class TextLayout:
+    """Lay out lines of text in a single font without rendering it.
+
+    The advance width of every glyph is kept in a NumPy array indexed by code point,
+    so measuring a batch of strings is a table lookup and a cumulative sum.
+    Kerning is ignored, which is a close enough approximation for wrapping.
+    """
+
+    def __init__(self, font: str) -> None:
+        self.font = ImageFont.truetype(font, REFERENCE_SIZE)
+        self.advances = np.full(0x110000, np.nan, dtype=np.float32)
+        for start, stop in PRELOAD_RANGES:
+            self._measure(np.arange(start, stop))
+
+    def _measure(self, code_points: NDArray[np.int64]) -> None:
+        getlength = self.font.getlength
+        self.advances[code_points] = [getlength(chr(cp)) for cp in code_points]
+
+    def _advances_of(self, text: str) -> NDArray[np.float32]:
+        code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        advances = self.advances[code_points]
+        if np.isnan(advances).any():
+            self._measure(np.unique(code_points[np.isnan(advances)]))
+            advances = self.advances[code_points]
+        return advances
+
+    def wrap(
+        self,
+        texts: Sequence[str],
+        sizes: Sequence[float],
+        line_widths: Sequence[float],
+        max_lines: Sequence[int],
+    ) -> list[list[str]]:
+        """Wrap each text on spaces into at most *max_lines* lines.
+
+        *sizes* are font sizes and *line_widths* the available widths, both in pixels.
+        Text that doesn't fit is cut at the last character that leaves room
+        for an ellipsis on the final line.
+        """
+        if not texts:
+            return []
+
+        # Measure every text in one pass: the advance of each character in pixels,
+        # then the running width of each text from its first character.
+        joined = ''.join(texts)
+        lengths = np.array([len(text) for text in texts])
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        scales = np.repeat(np.asarray(sizes, dtype=np.float64), lengths)
+        advances = self._advances_of(joined) * scales / REFERENCE_SIZE
+        ends = np.cumsum(advances)
+        ellipsis_width = float(self._advances_of(ELLIPSIS).sum()) / REFERENCE_SIZE
+
+        results = []
+        for text, start, size, width, limit in zip(
+            texts, starts, sizes, line_widths, max_lines
+        ):
+            # ends_text[i] is the width of text[:i + 1]
+            ends_text = ends[start : start + len(text)] - (
+                ends[start - 1] if start else 0
+            )
+            results.append(
+                _wrap_one(text, ends_text, width, limit, ellipsis_width * size)
+            )
+        return results
+
+
+@functools.cache
+def get_text_layout(font: str) -> TextLayout:
+    """Get the layout engine for *font*, shared by every card that uses it."""
+    return TextLayout(font)
+
+
+def _wrap_one(
+    text: str,
+    ends: NDArray[np.float64],
+    width: float,
+    max_lines: int,
+    ellipsis_width: float,
+) -> list[str]:
+    spaces = np.flatnonzero(np.frombuffer(text.encode('utf-32-le'), np.uint32) == 32)
+    lines: list[str] = []
+    pos = 0
+    while pos < len(text):
+        offset = ends[pos - 1] if pos else 0.0
+        # Index one past the last character that still fits on this line
+        fit = int(np.searchsorted(ends, offset + width, side='right'))
+        if fit >= len(text):
+            lines.append(text[pos:].rstrip())
+            break
+        if len(lines) == max_lines - 1:
+            # Last line allowed, cut it short and add an ellipsis
+            cut = int(
+                np.searchsorted(ends, offset + width - ellipsis_width, side='right')
+            )
+            lines.append(text[pos : max(cut, pos + 1)].rstrip() + ELLIPSIS)
+            break
+        # Break at the last space that fits, or mid-word if there is none
+        candidates = spaces[(spaces > pos) & (spaces <= fit)]
+        brk = int(candidates[-1]) if candidates.size else max(fit, pos + 1)
+        lines.append(text[pos:brk])
+        pos = brk + 1 if brk < len(text) and text[brk] == ' ' else brk
+    return lines or ['']
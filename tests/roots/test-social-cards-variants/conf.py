@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+extensions = ['sphinxext.opengraph']
+
+master_doc = 'index'
+exclude_patterns = ['_build']
+
+html_theme = 'basic'
+ogp_site_url = 'http://example.org/en/latest/'
+
+ogp_social_cards = {
+    'renderer': 'pillow',
+    'variants': ['opengraph', 'twitter', 'square@2x'],
+}
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 import conftest
@@ -110,7 +111,7 @@ def test_image_social_cards(meta_tags):
     pytest.importorskip('matplotlib')
     # Asserting `in` instead of `==` because of the hash that is generated
     assert (
-        'http://example.org/en/latest/_images/social_previews/summary_index'
+        'http://example.org/en/latest/_images/social_previews/summary_'
         in get_tag_content(meta_tags, 'image')
     )
     # Image alt text should be taken from page content.
@@ -118,12 +119,631 @@ def test_image_social_cards(meta_tags):
         'Lorem ipsum dolor sit amet, consectetur adipiscing elit.'
         in get_tag_content(meta_tags, 'image:alt')
     )
+    assert get_tag_content(meta_tags, 'image:type') == 'image/png'
     # Make sure the extra tags are in the HTML
     assert 'summary_large_image' in get_tag_content(
         meta_tags, 'card', kind='name', prefix='twitter'
     )
 
 
+@pytest.mark.sphinx('html', testroot='simple')
+def test_social_cards_not_pickled(app: Sphinx, meta_tags):
+    """Renderers should be released after the build and kept out of the env."""
+    pytest.importorskip('matplotlib')
+    from sphinxext.opengraph import _social_cards
+
+    assert get_tag_content(meta_tags, 'image')
+    assert not _social_cards._renderers
+    assert not any(name.startswith('ogp_social_card') for name in vars(app.env))
+
+
+@pytest.mark.sphinx('html', testroot='simple', parallel=2)
+def test_social_cards_prewarm(app: Sphinx, monkeypatch):
+    """The renderer should be built before Sphinx forks its writer processes."""
+    pytest.importorskip('matplotlib')
+    from sphinxext.opengraph import _social_cards
+
+    prewarmed = []
+    prewarm_renderer = _social_cards.prewarm_renderer
+
+    def record_prewarm(*args, **kwargs):
+        prewarm_renderer(*args, **kwargs)
+        prewarmed.append(len(_social_cards._renderers))
+
+    monkeypatch.setattr(_social_cards, 'prewarm_renderer', record_prewarm)
+    app.build(force_all=True)
+
+    assert prewarmed == [1]
+    tags = conftest._meta_tags(app)
+    image_path = get_tag_content(tags, 'image').removeprefix(
+        'http://example.org/en/latest/'
+    )
+    assert (app.outdir / image_path).is_file()
+
+
+@pytest.mark.sphinx('html', testroot='simple')
+def test_social_cards_missing_renderer(app: Sphinx, monkeypatch):
+    """A missing renderer should only fail the build if cards were configured."""
+    from sphinxext.opengraph import _social_cards
+
+    monkeypatch.setitem(
+        _social_cards.RENDERERS, 'matplotlib', ('missing_module', 'Renderer', 'x')
+    )
+    monkeypatch.setattr(_social_cards, '_missing_renderers', set())
+    app.build(force_all=True)
+    assert 'missing_module is not installed' in app.status.getvalue()
+    assert 'missing_module is not installed' not in app.warning.getvalue()
+    tags = conftest._meta_tags(app)
+    assert not any(tag.get('property') == 'og:image' for tag in tags)
+
+    monkeypatch.setattr(_social_cards, '_missing_renderers', set())
+    app.config.ogp_social_cards = {'line_color': '#ff6600'}
+    app.build(force_all=True)
+    assert 'missing_module is not installed' in app.warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-pillow-font-name',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'font': 'No Such Font'}},
+)
+def test_social_cards_pillow_font_name(app: Sphinx):
+    """A font family name should be a configuration error with Pillow."""
+    pytest.importorskip('PIL')
+    from sphinx.errors import ConfigError
+
+    with pytest.raises(ConfigError, match="not 'No Such Font'"):
+        app.build()
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-workers')
+def test_social_cards_workers(app: Sphinx, meta_tags):
+    """Cards rendered on the worker pool should exist once the build finishes."""
+    pytest.importorskip('matplotlib')
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = image_url.removeprefix('http://example.org/en/latest/')
+    assert image_path.startswith('_images/social_previews/summary_')
+    assert (app.outdir / image_path).is_file()
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-pillow')
+def test_social_cards_pillow(app: Sphinx, meta_tags):
+    """The Pillow renderer should write a card of the advertised size."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = image_url.removeprefix('http://example.org/en/latest/')
+    with Image.open(app.outdir / image_path) as img:
+        assert img.size == (
+            int(get_tag_content(meta_tags, 'image:width')),
+            int(get_tag_content(meta_tags, 'image:height')),
+        )
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-format')
+def test_social_cards_format(app: Sphinx, meta_tags):
+    """The card file and its metadata should follow the configured format."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    image_url = get_tag_content(meta_tags, 'image')
+    assert image_url.endswith('.webp')
+    assert get_tag_content(meta_tags, 'image:type') == 'image/webp'
+    image_path = image_url.removeprefix('http://example.org/en/latest/')
+    with Image.open(app.outdir / image_path) as img:
+        assert img.format == 'WEBP'
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-variants')
+def test_social_cards_variants(app: Sphinx, meta_tags):
+    """Each card variant should be written and linked with its own size."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    def image_size(url):
+        path = url.removeprefix('http://example.org/en/latest/')
+        with Image.open(app.outdir / path) as img:
+            return img.size
+
+    image_urls = [
+        tag['content'] for tag in meta_tags if tag.get('property') == 'og:image'
+    ]
+    widths = [
+        tag['content'] for tag in meta_tags if tag.get('property') == 'og:image:width'
+    ]
+    heights = [
+        tag['content'] for tag in meta_tags if tag.get('property') == 'og:image:height'
+    ]
+    assert len(image_urls) == 2
+    assert widths == ['1146', '1200']
+    assert heights == ['600', '1200']
+    assert [image_size(url) for url in image_urls] == [(1146, 600), (1200, 1200)]
+
+    twitter_url = get_tag_content(meta_tags, 'image', kind='name', prefix='twitter')
+    assert twitter_url not in image_urls
+    assert image_size(twitter_url) == (1200, 600)
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-overrides')
+def test_social_cards_page_overrides(app: Sphinx, meta_tags):
+    """Card options set in the page metadata should apply to its card."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = image_url.removeprefix('http://example.org/en/latest/')
+    with Image.open(app.outdir / image_path) as img:
+        assert img.getpixel((5, 5))[:3] == (255, 0, 0)
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-shared')
+def test_social_cards_shared(app: Sphinx, meta_tags):
+    """Pages matching a shared pattern should link the same section card."""
+    pytest.importorskip('PIL')
+    from bs4 import BeautifulSoup
+
+    def page_tags(docname):
+        html = (app.outdir / f'{docname}.html').read_text(encoding='utf-8')
+        return BeautifulSoup(html, 'html.parser').find_all('meta')
+
+    one, two = page_tags('api/one'), page_tags('api/two')
+    shared_url = get_tag_content(one, 'image')
+    assert '_images/social_previews/summary_' in shared_url
+    assert get_tag_content(two, 'image') == shared_url
+    assert get_tag_content(one, 'image:alt') == 'Every function.'
+    # The page's own description is kept
+    assert get_tag_content(one, 'description') == 'The one function.'
+
+    assert get_tag_content(meta_tags, 'image') != shared_url
+    cards = list((app.outdir / '_images/social_previews').iterdir())
+    assert len(cards) == 2
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-dedup')
+def test_social_cards_dedup(app: Sphinx, meta_tags):
+    """Pages with identical cards should share a single image file."""
+    pytest.importorskip('PIL')
+    from bs4 import BeautifulSoup
+
+    def page_image(docname):
+        html = (app.outdir / f'{docname}.html').read_text(encoding='utf-8')
+        tags = BeautifulSoup(html, 'html.parser').find_all('meta')
+        return get_tag_content(tags, 'image')
+
+    assert page_image('one') == page_image('two')
+    assert page_image('one') != get_tag_content(meta_tags, 'image')
+    cards = list((app.outdir / '_images/social_previews').iterdir())
+    assert len(cards) == 2
+
+
+@pytest.mark.sphinx('html', testroot='social-cards-pillow')
+def test_social_cards_index(app: Sphinx, meta_tags):
+    """Existing cards should be looked up in the index scanned at start-up."""
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph import _social_cards
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    card_dir = Path(app.outdir) / _social_cards.CARD_DIRECTORY
+    assert image_path.name in _social_cards.load_card_index(app.outdir)
+    # The index only lasts for one build
+    _social_cards.clear_card_index()
+    app.build()
+    assert card_dir not in _social_cards._card_indexes
+
+    # The index is scanned again by the next build, which renders missing cards
+    image_path.unlink()
+    app.build(force_all=True)
+    assert image_path.is_file()
+
+
+@pytest.mark.sphinx(
+    'html', testroot='social-cards-dedup', srcdir='social-cards-cleanup', parallel=2
+)
+def test_social_cards_cleanup(app: Sphinx):
+    """Cards no page links to should be removed once every page is written."""
+    pytest.importorskip('PIL')
+    import os
+    import time
+
+    from sphinxext.opengraph._social_cards import CARD_LOCK_TIMEOUT
+
+    card_dir = Path(app.outdir) / '_images/social_previews'
+    card_dir.mkdir(parents=True, exist_ok=True)
+    (card_dir / 'summary_0000000000000000.png').write_bytes(b'')
+    (card_dir / 'unrelated.txt').write_bytes(b'')
+    # Files left by a killed build, and by one that may still be running
+    old = time.time() - 2 * CARD_LOCK_TIMEOUT
+    for name in ('.summary_1.png.lock', '.summary_2.png.123-456.tmp'):
+        (card_dir / name).write_bytes(b'')
+        os.utime(card_dir / name, (old, old))
+    (card_dir / '.summary_3.png.lock').write_bytes(b'')
+
+    app.build(force_all=True)
+    cards = sorted(path.name for path in card_dir.iterdir())
+    assert 'summary_0000000000000000.png' not in cards
+    assert 'unrelated.txt' in cards
+    assert '.summary_1.png.lock' not in cards
+    assert '.summary_2.png.123-456.tmp' not in cards
+    assert '.summary_3.png.lock' in cards
+    # The cards of pages written by the parallel writers are kept
+    assert len(cards) == 4
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-cleanup-report',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'cleanup': 'report'}},
+)
+def test_social_cards_cleanup_report(app: Sphinx):
+    """In report mode, unused cards should be listed but kept."""
+    pytest.importorskip('PIL')
+    card_dir = Path(app.outdir) / '_images/social_previews'
+    card_dir.mkdir(parents=True, exist_ok=True)
+    (card_dir / 'summary_0000000000000000.png').write_bytes(b'')
+
+    app.build(force_all=True)
+    assert (card_dir / 'summary_0000000000000000.png').exists()
+    assert 'summary_0000000000000000.png' in app.status.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-sharded',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'shard_levels': 2}},
+)
+def test_social_cards_sharded(app: Sphinx, meta_tags):
+    """Cards should be stored and linked under their hash-prefix directories."""
+    pytest.importorskip('PIL')
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = image_url.removeprefix('http://example.org/en/latest/')
+    prefix, shard_1, shard_2, name = image_path.rsplit('/', 3)
+    assert prefix == '_images/social_previews'
+    assert name.startswith(f'summary_{shard_1}{shard_2}')
+    assert (app.outdir / image_path).is_file()
+
+    # Rebuilding keeps the card and removes unused cards from other shards
+    stale = Path(app.outdir) / '_images/social_previews/00/00/summary_0000.png'
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b'')
+    app.build(force_all=True)
+    assert (app.outdir / image_path).is_file()
+    assert not stale.exists()
+
+
+@pytest.mark.sphinx(
+    'html', testroot='social-cards-pillow', srcdir='social-cards-concurrent'
+)
+def test_social_cards_concurrent_build(app: Sphinx, meta_tags, monkeypatch):
+    """A card locked by another build should be waited for, not rendered again."""
+    pytest.importorskip('PIL')
+    import threading
+
+    from sphinxext.opengraph import _social_cards
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    card = image_path.read_bytes()
+
+    # Another build holds the lock of the card and writes it a little later
+    image_path.unlink()
+    lock = _social_cards.card_lock_path(image_path)
+    assert _social_cards.acquire_card_lock(lock)
+
+    def other_build():
+        image_path.write_bytes(card)
+        _social_cards.release_card_lock(lock)
+
+    rendered = []
+    monkeypatch.setattr(
+        _social_cards, '_render_pool_job', lambda *args: rendered.append(args)
+    )
+    timer = threading.Timer(0.2, other_build)
+    timer.start()
+    app.build(force_all=True)
+    timer.join()
+
+    assert image_path.read_bytes() == card
+    assert not lock.exists()
+    assert not rendered
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-cache',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'cache_dir': '_cache'}},
+)
+def test_social_cards_cache(app: Sphinx, meta_tags, monkeypatch):
+    """A card already in the shared cache should be used instead of rendered."""
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph import _social_cards
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    card = image_path.read_bytes()
+    assert (Path(app.srcdir) / '_cache/cards' / image_path.name[8:10]).is_dir()
+
+    # A clean build gets the card from the cache
+    image_path.unlink()
+    monkeypatch.setattr(_social_cards, 'render_cards', None)
+    app.build(force_all=True)
+    assert image_path.read_bytes() == card
+    assert 'card cache: 1 hits, 0 misses' in app.status.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-fingerprint',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'image': 'logo.png'}},
+)
+def test_social_cards_fingerprint(app: Sphinx):
+    """Only changing what is drawn, such as the logo, should rename the cards."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    def card_url():
+        return get_tag_content(conftest._meta_tags(app), 'image')
+
+    logo = Path(app.srcdir) / 'logo.png'
+    Image.new('RGB', (10, 10), 'red').save(logo)
+    app.build(force_all=True)
+    first = card_url()
+
+    app.build(force_all=True)
+    assert card_url() == first
+
+    # Options that don't change the image keep the name of the card
+    app.config.ogp_social_cards['render_timeout'] = 60
+    app.config.ogp_social_cards['cleanup'] = 'report'
+    app.build(force_all=True)
+    assert card_url() == first
+
+    Image.new('RGB', (10, 10), 'blue').save(logo)
+    app.build(force_all=True)
+    assert card_url() != first
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-dedup',
+    srcdir='social-cards-missing-image',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'image': 'missing.png'}},
+)
+def test_social_cards_missing_image(app: Sphinx):
+    """A missing image should be reported once, and only when cards are made."""
+    pytest.importorskip('PIL')
+    message = "image file doesn't exist"
+    app.build()
+    assert app.warning.getvalue().count(message) == 1
+
+    app.warning.seek(0)
+    app.warning.truncate()
+    app.build(force_all=True)
+    assert message not in app.warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-dedup',
+    srcdir='social-cards-budget',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'render_budget': 0}},
+)
+def test_social_cards_render_budget(app: Sphinx, meta_tags):
+    """Once the render budget is used up, pages should get the default card."""
+    pytest.importorskip('PIL')
+    from bs4 import BeautifulSoup
+
+    def page_image(docname):
+        html = (app.outdir / f'{docname}.html').read_text(encoding='utf-8')
+        tags = BeautifulSoup(html, 'html.parser').find_all('meta')
+        return get_tag_content(tags, 'image')
+
+    default_url = get_tag_content(meta_tags, 'image')
+    assert page_image('one') == default_url
+    image_path = default_url.removeprefix('http://example.org/en/latest/')
+    assert (app.outdir / image_path).is_file()
+    cards = list((app.outdir / '_images/social_previews').iterdir())
+    assert len(cards) == 1
+    assert 'using the default card for one' in app.warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-timeout',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'render_timeout': 1e-9}},
+)
+def test_social_cards_render_timeout(app: Sphinx, meta_tags):
+    """A card that takes too long to render should be replaced by the default."""
+    pytest.importorskip('PIL')
+    image_url = get_tag_content(meta_tags, 'image')
+    assert (
+        app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    ).is_file()
+    assert 'rendering took longer than' in app.warning.getvalue()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-timeout-renderers',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'render_timeout': 60}},
+)
+def test_social_cards_timeout_discards_renderers(app: Sphinx, monkeypatch):
+    """Renderers interrupted by a timeout should not draw any later card."""
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph import _social_cards
+
+    interrupted = []
+    original_render_cards = _social_cards.render_cards
+
+    def render_cards(renderers, site_title, page_title, *args):
+        if not page_title:
+            return original_render_cards(renderers, site_title, page_title, *args)
+        interrupted.extend(renderers)
+        msg = 'rendering took longer than 1e-09 seconds'
+        raise TimeoutError(msg)
+
+    monkeypatch.setattr(_social_cards, 'render_cards', render_cards)
+    monkeypatch.setattr(_social_cards, 'close_renderers', lambda: None)
+    app.build()
+    monkeypatch.undo()
+    assert 'rendering took longer than' in app.warning.getvalue()
+    assert interrupted
+    assert not set(interrupted) & set(_social_cards._renderers.values())
+    _social_cards.close_renderers()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-pool-timeout',
+    confoverrides={
+        'ogp_social_cards': {'renderer': 'pillow', 'workers': 2, 'render_timeout': 1e-9}
+    },
+)
+def test_social_cards_pool_fallback(app: Sphinx):
+    """A default card written by the pool should be replaced by a later build."""
+    pytest.importorskip('PIL')
+    app.build()
+    image_url = get_tag_content(conftest._meta_tags(app), 'image')
+    path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    default_card = path.read_bytes()
+    assert 'using the default card for index' in app.warning.getvalue()
+
+    app.config.ogp_social_cards['render_timeout'] = None
+    app.build(force_all=True)
+    assert get_tag_content(conftest._meta_tags(app), 'image') == image_url
+    assert path.read_bytes() != default_card
+
+    # Once replaced, the card is found in the output directory again
+    mtime = path.stat().st_mtime_ns
+    app.build(force_all=True)
+    assert path.stat().st_mtime_ns == mtime
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-pillow',
+    srcdir='social-cards-draft',
+    confoverrides={'ogp_social_cards': {'renderer': 'pillow', 'draft': True}},
+)
+def test_social_cards_draft(app: Sphinx, meta_tags):
+    """Draft cards should be rendered at a fraction of their size."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    image_url = get_tag_content(meta_tags, 'image')
+    image_path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    with Image.open(image_path) as image:
+        assert image.size == (286, 150)
+    assert get_tag_content(meta_tags, 'image:width') == '286'
+
+
+@pytest.mark.sphinx(
+    'html', testroot='social-cards-pillow', srcdir='social-cards-draft-cleanup'
+)
+def test_social_cards_draft_cleanup(app: Sphinx, monkeypatch):
+    """A draft build should keep the cards of full builds."""
+    pytest.importorskip('PIL')
+
+    def card_path():
+        image_url = get_tag_content(conftest._meta_tags(app), 'image')
+        return app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+
+    app.build(force_all=True)
+    full_card = card_path()
+    mtime = full_card.stat().st_mtime_ns
+
+    monkeypatch.setenv('OGP_SOCIAL_CARDS_DRAFT', '1')
+    app.build(force_all=True)
+    assert card_path() != full_card
+    assert full_card.is_file()
+
+    # The next full build uses the card again, and removes the draft card
+    draft_card = card_path()
+    monkeypatch.delenv('OGP_SOCIAL_CARDS_DRAFT')
+    app.build(force_all=True)
+    assert card_path() == full_card
+    assert full_card.stat().st_mtime_ns == mtime
+    assert not draft_card.exists()
+
+
+@pytest.mark.sphinx(
+    'html', testroot='social-cards-pillow', srcdir='social-cards-draft-skip'
+)
+def test_social_cards_draft_skip(app: Sphinx, monkeypatch):
+    """Skipped drafts should link to the card that a full build renders."""
+    pytest.importorskip('PIL')
+    monkeypatch.setenv('OGP_SOCIAL_CARDS_DRAFT', 'skip')
+    app.build(force_all=True)
+    image_url = get_tag_content(conftest._meta_tags(app), 'image')
+    image_path = app.outdir / image_url.removeprefix('http://example.org/en/latest/')
+    assert not image_path.exists()
+
+    monkeypatch.delenv('OGP_SOCIAL_CARDS_DRAFT')
+    app.build(force_all=True)
+    assert get_tag_content(conftest._meta_tags(app), 'image') == image_url
+    assert image_path.is_file()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='social-cards-dedup',
+    srcdir='social-cards-manifest',
+    parallel=2,
+    confoverrides={
+        'ogp_social_cards': {'renderer': 'pillow', 'manifest': '_build/cards.json'}
+    },
+)
+def test_social_cards_manifest(app: Sphinx, capsys, tmp_path):
+    """Cards listed in the manifest should be rendered by the command line."""
+    pytest.importorskip('PIL')
+    import json
+    import shutil
+
+    from sphinxext.opengraph.__main__ import main
+
+    app.build(force_all=True)
+    path_manifest = Path(app.srcdir) / '_build/cards.json'
+    jobs = json.loads(path_manifest.read_text(encoding='utf-8'))['jobs']
+    assert len(jobs) == 2
+    assert {job['page'] for job in jobs} <= {'index', 'one', 'two'}
+    paths = [app.outdir / job['paths'][0] for job in jobs]
+    assert not any(path.exists() for path in paths)
+
+    # Each shard renders its own part of the cards
+    assert main([str(path_manifest), '--shard', '1/2']) == 0
+    assert sum(path.exists() for path in paths) == 1
+    assert main([str(path_manifest), '--shard', '2/2']) == 0
+    assert all(path.exists() for path in paths)
+    assert 'Rendered 1 of 1 cards' in capsys.readouterr().out
+
+    # The manifest can be used from another checkout of the project
+    moved = tmp_path / 'moved'
+    shutil.copytree(app.srcdir, moved)
+    for path in paths:
+        (moved / path.relative_to(app.srcdir)).unlink()
+    assert main([str(moved / '_build/cards.json')]) == 0
+    assert all((moved / path.relative_to(app.srcdir)).exists() for path in paths)
+
+    # A card that fails to render names its page, and the others are rendered
+    manifest = json.loads(path_manifest.read_text(encoding='utf-8'))
+    manifest['jobs'][0]['renderer'] = 'unknown'
+    path_manifest.write_text(json.dumps(manifest), encoding='utf-8')
+    for path in paths:
+        path.unlink()
+    assert main([str(path_manifest)]) == 1
+    assert f'card of {manifest["jobs"][0]["page"]}' in capsys.readouterr().err
+    assert (app.outdir / manifest['jobs'][1]['paths'][0]).exists()
+
+
 @pytest.mark.sphinx('html', testroot='type')
 def test_type(og_meta_tags):
     assert get_tag_content(og_meta_tags, 'type') == 'article'
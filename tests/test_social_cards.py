@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Import time of the extension on top of Sphinx itself, in microseconds
+IMPORT_TIME_BUDGET = 100_000
+# Heavy modules that must only be loaded once a page needs a social card
+LAZY_MODULES = ('matplotlib', 'numpy', 'PIL', 'concurrent.futures.process')
+
+PATH_FONT = Path(__file__).parent.parent / 'sphinxext/opengraph/_static/Roboto-Flex.ttf'
+
+
+@pytest.fixture(scope='module')
+def text_layout():
+    pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph._text_layout import TextLayout
+
+    return TextLayout(str(PATH_FONT))
+
+
+def test_wrap_fits_line_width(text_layout):
+    from PIL import ImageFont
+
+    font = ImageFont.truetype(str(PATH_FONT), 40)
+    text = 'The quick brown fox jumps over the lazy dog ' * 3
+    (lines,) = text_layout.wrap([text], sizes=[40], line_widths=[400], max_lines=[10])
+    assert ' '.join(lines) == text.strip()
+    assert len(lines) > 1
+    # Kerning is ignored, so allow a little slack
+    assert all(font.getlength(line) <= 400 * 1.02 for line in lines)
+
+
+def test_wrap_truncates_with_ellipsis(text_layout):
+    texts = ['word ' * 100, 'short', '']
+    long, short, empty = text_layout.wrap(
+        texts, sizes=[20, 20, 20], line_widths=[300, 300, 300], max_lines=[2, 2, 2]
+    )
+    assert len(long) == 2
+    assert long[-1].endswith('...')
+    assert short == ['short']
+    assert empty == ['']
+
+
+def test_wrap_unknown_glyphs(text_layout):
+    (lines,) = text_layout.wrap(
+        ['日本語のテキスト ' * 20], sizes=[20], line_widths=[200], max_lines=[3]
+    )
+    assert len(lines) == 3
+
+
+def test_title_clear_of_logo():
+    pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph._social_cards import CARD_VARIANTS, layout_cards
+    from sphinxext.opengraph._social_cards_pillow import PillowRenderer
+
+    width, height = CARD_VARIANTS['square']
+    renderer = PillowRenderer(width=width, height=height)
+    [(title, _)] = layout_cards([renderer], 'A fairly long page title ' * 3, '')
+    assert len(title.splitlines()) > 1
+    # The logo is drawn in the top right, in a square of 0.3 the shorter side
+    logo_left = 0.95 * width - 0.3 * min(width, height)
+    for line in title.splitlines():
+        right = 0.05 * width + renderer.font_page_title.getlength(line)
+        assert right < logo_left
+
+
+def test_card_writer_flushes_on_close(tmp_path):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    from sphinxext.opengraph._social_cards import SocialCardWriter
+
+    # A queue of one makes each put wait for the previous card to be taken
+    writer = SocialCardWriter(maxsize=1)
+    paths = [tmp_path / f'card_{i}.png' for i in range(5)]
+    for i, path in enumerate(paths):
+        writer.put(Image.new('RGBA', (8, 4), (i, 0, 0, 255)), path)
+    writer.close()
+    for i, path in enumerate(paths):
+        with Image.open(path) as img:
+            assert img.size == (8, 4)
+            assert img.getpixel((0, 0)) == (i, 0, 0, 255)
+
+
+@pytest.mark.parametrize(
+    ('card_format', 'pil_format', 'mode'),
+    [
+        ('png', 'PNG', 'RGBA'),
+        ('png-quantized', 'PNG', 'P'),
+        ('webp', 'WEBP', 'RGB'),
+        ('jpeg', 'JPEG', 'RGB'),
+    ],
+)
+def test_save_social_card_formats(tmp_path, card_format, pil_format, mode):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    from sphinxext.opengraph._social_cards import save_social_card
+
+    card = Image.new('RGBA', (64, 32), 'white')
+    card.paste((47, 54, 61, 255), (0, 28, 64, 32))
+    path = tmp_path / 'card'
+    save_social_card(card, path, (card_format, 50))
+    with Image.open(path) as img:
+        assert img.format == pil_format
+        assert img.mode == mode
+        assert img.size == card.size
+
+
+def test_load_fitted_image_cache(tmp_path):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    from sphinxext.opengraph import _image_cache
+
+    path = tmp_path / 'logo.png'
+    Image.new('RGBA', (400, 200), 'red').save(path)
+    cache_dir = tmp_path / 'cache'
+
+    img = _image_cache.load_fitted_image(path, (100, 100), cache_dir=cache_dir)
+    assert img.size == (100, 50)
+    (path_cached,) = cache_dir.iterdir()
+    assert path_cached.name.endswith('_100x100.png')
+
+    # A new process finds the scaled image on disk instead of the original
+    _image_cache._fitted.clear()
+    Image.new('RGBA', (100, 50), 'blue').save(path_cached)
+    img = _image_cache.load_fitted_image(path, (100, 100), cache_dir=cache_dir)
+    assert img.getpixel((0, 0)) == (0, 0, 255, 255)
+
+
+def test_renderer_lru(monkeypatch):
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph import _social_cards
+
+    monkeypatch.setattr(_social_cards, '_renderers', type(_social_cards._renderers)())
+    colors = ('red', 'green', 'blue')
+    renderers = [
+        _social_cards.get_social_card_renderer(
+            'pillow', {'line_color': color}, cache_size=2
+        )
+        for color in colors
+    ]
+    assert len(_social_cards._renderers) == 2
+
+    # The most recently used renderers are kept and reused
+    assert (
+        _social_cards.get_social_card_renderer(
+            'pillow', {'line_color': 'blue'}, cache_size=2
+        )
+        is renderers[2]
+    )
+    assert (
+        _social_cards.get_social_card_renderer(
+            'pillow', {'line_color': 'red'}, cache_size=2
+        )
+        is not renderers[0]
+    )
+    _social_cards.close_renderers()
+
+
+def test_card_lock(tmp_path):
+    import os
+
+    from sphinxext.opengraph import _social_cards
+
+    lock = _social_cards.card_lock_path(tmp_path / 'summary_0.png')
+    assert _social_cards.acquire_card_lock(lock)
+    assert not _social_cards.acquire_card_lock(lock)
+
+    # A lock left behind by a killed build is taken over
+    stale = lock.stat().st_mtime - _social_cards.CARD_LOCK_TIMEOUT - 1
+    os.utime(lock, (stale, stale))
+    assert _social_cards.acquire_card_lock(lock)
+    _social_cards.release_card_lock(lock)
+    assert not lock.exists()
+
+
+def test_save_social_card_atomic(tmp_path):
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    from sphinxext.opengraph._social_cards import save_social_card
+
+    path = tmp_path / 'card.png'
+    save_social_card(Image.new('RGBA', (8, 4)), path)
+    # Nothing but the card is left in the directory
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_import_time():
+    """Importing the extension should not load the social card renderers."""
+    result = subprocess.run(  # NoQA: S603
+        (
+            sys.executable,
+            '-X',
+            'importtime',
+            '-c',
+            'import sphinx.application; import sphinxext.opengraph',
+        ),
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # Lines look like "import time: <self us> | <cumulative us> | <module>"
+    lines = result.stderr.splitlines()
+    start = next(
+        i for i, line in enumerate(lines) if line.endswith('| sphinx.application')
+    )
+    imported = {}
+    for line in lines[start + 1 :]:
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        imported[name.strip()] = int(cumulative)
+
+    assert not [name for name in imported if name.split('.')[0] in LAZY_MODULES] + [
+        name for name in imported if name in LAZY_MODULES
+    ]
+    assert imported['sphinxext.opengraph'] < IMPORT_TIME_BUDGET
+
+
+def test_parallel_non_html_build_is_lazy(tmp_path):
+    """Builders other than HTML should never load the social card renderers."""
+    root = Path(__file__).parent / 'roots/test-social-cards-workers'
+    script = (
+        'import sys; from sphinx.cmd.build import build_main; '
+        f'code = build_main(["-q", "-j", "2", "-b", "text", {str(root)!r}, '
+        f'{str(tmp_path / "out")!r}, "-d", {str(tmp_path / "doctrees")!r}]); '
+        f'print(sorted(m for m in ("matplotlib", "numpy") if m in sys.modules)); '
+        'sys.exit(code)'
+    )
+    result = subprocess.run(  # NoQA: S603
+        (sys.executable, '-c', script), capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == '[]'
+    assert not (tmp_path / 'doctrees/ogp_social_cards').exists()
+
+
+def test_card_cache(tmp_path):
+    import os
+
+    from sphinxext.opengraph._card_cache import CardCache
+
+    cache = CardCache(tmp_path / 'cache', max_size=6)
+    out = tmp_path / 'out'
+    out.mkdir()
+    for name in ('summary_aa.png', 'summary_bb.png'):
+        (out / name).write_bytes(b'card')
+        cache.store(out / name)
+    (out / 'summary_aa.png').unlink()
+
+    assert cache.fetch([out / 'summary_aa.png'])
+    assert (out / 'summary_aa.png').read_bytes() == b'card'
+    assert not cache.fetch([out / 'summary_cc.png'])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # The card used least recently is evicted first
+    old = cache.path('summary_bb.png').stat().st_mtime - 10
+    os.utime(cache.path('summary_bb.png'), (old, old))
+    assert cache.trim() == 1
+    assert cache.path('summary_aa.png').exists()
+    assert not cache.path('summary_bb.png').exists()
+
+
+def test_asset_digest(tmp_path, monkeypatch):
+    import hashlib
+    import os
+
+    from sphinxext.opengraph import _social_cards
+
+    monkeypatch.setattr(_social_cards, '_asset_digests', {})
+    path = tmp_path / 'logo.png'
+    path.write_bytes(b'one')
+    digest = _social_cards.asset_digest(path)
+    assert digest == hashlib.sha256(b'one').hexdigest()
+
+    # The hash is kept while the size and modification time are unchanged
+    mtime = path.stat().st_mtime_ns
+    path.write_bytes(b'two')
+    os.utime(path, ns=(mtime, mtime))
+    assert _social_cards.asset_digest(path) == digest
+    path.write_bytes(b'three')
+    assert _social_cards.asset_digest(path) != digest
+    assert _social_cards.asset_digest(tmp_path / 'missing.png') == ''
+
+
+def test_style_fingerprint_ignores_paths(tmp_path, monkeypatch):
+    pytest.importorskip('PIL')
+    from sphinxext.opengraph import _social_cards
+
+    monkeypatch.setattr(_social_cards, '_style_fingerprints', {})
+    fingerprints = []
+    for checkout in ('one', 'two'):
+        srcdir = tmp_path / checkout
+        srcdir.mkdir()
+        (srcdir / 'logo.png').write_bytes(b'logo')
+        kwargs_fig = _social_cards.social_card_figure_kwargs(
+            {'image': 'logo.png', 'line_color': '#ff6600'},
+            srcdir=srcdir,
+            doctreedir=srcdir / '_build/doctrees',
+        )
+        fingerprints.append(_social_cards.style_fingerprint('pillow', kwargs_fig))
+    # The same files in another checkout keep the name of the card
+    assert fingerprints[0] == fingerprints[1]
+
+    (tmp_path / 'two/logo.png').write_bytes(b'another logo')
+    kwargs_fig = _social_cards.social_card_figure_kwargs(
+        {'image': 'logo.png', 'line_color': '#ff6600'}, srcdir=tmp_path / 'two'
+    )
+    assert _social_cards.style_fingerprint('pillow', kwargs_fig) != fingerprints[0]
+
+
+def test_card_text_not_cut_by_characters(monkeypatch):
+    from types import SimpleNamespace
+
+    from sphinxext.opengraph import _social_cards, social_card_for_page
+
+    texts = []
+
+    def create_social_card(config_social, site_name, title, description, *a, **kw):
+        texts.append((title, description))
+
+    monkeypatch.setattr(_social_cards, 'create_social_card', create_social_card)
+    # Longer than the old character limits, the layout decides what fits
+    title = 'Use it in a web app ' * 5
+    description = 'A b c d e f g h. ' * 12
+    social_card_for_page(
+        {},
+        'Site',
+        title,
+        description,
+        'http://example.org/',
+        'http://example.org/page.html',
+        srcdir='.',
+        outdir='.',
+        config=SimpleNamespace(html_logo=None, ogp_social_cards=None),
+        env=None,
+    )
+    assert texts == [(title, description)]
+
+
+def test_style_fingerprint_without_distribution(monkeypatch):
+    pytest.importorskip('PIL')
+    import importlib.metadata
+
+    from sphinxext.opengraph import _social_cards
+
+    def version(name):
+        raise importlib.metadata.PackageNotFoundError(name)
+
+    # Pillow may be installed under another name, such as Pillow-SIMD
+    monkeypatch.setattr(importlib.metadata, 'version', version)
+    monkeypatch.setattr(_social_cards, '_style_fingerprints', {})
+    assert _social_cards.style_fingerprint('pillow', {})
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Sphinx only forks on POSIX')
+def test_render_time_shared_with_forked_writers(monkeypatch):
+    import multiprocessing
+
+    from sphinxext.opengraph import _social_cards
+
+    monkeypatch.setattr(_social_cards, '_render_time', None)
+    _social_cards.start_render_time()
+    # Like the writer processes Sphinx forks for parallel builds
+    writer = multiprocessing.get_context('fork').Process(
+        target=_social_cards.add_render_time, args=(2.0,)
+    )
+    writer.start()
+    writer.join()
+    _social_cards.add_render_time(1.0)
+    assert _social_cards.spent_render_time() == 3.0
+
+
+def test_renderer_must_implement_draw():
+    from sphinxext.opengraph._social_cards import SocialCardRenderer
+
+    class IncompleteRenderer(SocialCardRenderer):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError, match='draw'):
+        IncompleteRenderer()